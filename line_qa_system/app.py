@@ -206,6 +206,8 @@ def initialize_services():
             rag_service = None  # 明示的にNoneを設定
         
         flow_service = FlowService(session_service, qa_service, rag_service, ai_service)
+        # フローデータはリクエスト受付を妨げないようバックグラウンドで読み込む
+        flow_service.start_background_load()
         logger.info("FlowServiceの初期化が完了しました")
         
         # DocumentCollectorの初期化（RAG機能が有効な場合）
@@ -473,7 +475,7 @@ def process_text_message(event: Dict[str, Any], start_time: float):
         if Config.AUTH_ENABLED:
             logger.info("認証チェックを開始します", user_id=hashed_user_id)
             from .optimized_auth_flow import OptimizedAuthFlow
-            auth_flow = OptimizedAuthFlow()
+            auth_flow = OptimizedAuthFlow.get_instance()
 
             # 認証フローの処理
             if auth_flow.process_auth_flow(event):
@@ -609,7 +611,7 @@ def process_text_message(event: Dict[str, Any], start_time: float):
             if Config.AUTH_ENABLED:
                 try:
                     from .optimized_auth_flow import OptimizedAuthFlow
-                    auth_flow = OptimizedAuthFlow()
+                    auth_flow = OptimizedAuthFlow.get_instance()
                     auth_data = auth_flow.get_auth_info(user_id)
                     if auth_data:
                         store_code = auth_data.get('store_code', '')
@@ -651,10 +653,11 @@ def process_text_message(event: Dict[str, Any], start_time: float):
                 print(f"🤔 Q&Aに該当なし。RAGで回答を試行します: message='{message_text}'")
                 logger.info("Q&Aに該当なし。RAGで回答を試行", user_id=hashed_user_id, message=message_text)
 
-                # 処理中メッセージを送信（RAG検索は時間がかかるため）
+                # 処理中メッセージを送信（RAG検索は時間がかかるため、送信完了を待たずに検索を開始）
+                thinking_sent = None
                 if rag_service and rag_service.is_enabled:
                     try:
-                        line_client.push_message(user_id, "💭 考え中です...")
+                        thinking_sent = line_client.push_message_async(user_id, "💭 考え中です...")
                         print(f"💬 処理中メッセージを送信しました")
                         logger.info("処理中メッセージを送信", user_id=hashed_user_id)
                     except Exception as e:
@@ -685,6 +688,10 @@ def process_text_message(event: Dict[str, Any], start_time: float):
                 else:
                     print(f"❌ RAGサービスが無効です: rag_service={rag_service is not None}, is_enabled={rag_service.is_enabled if rag_service else 'N/A'}")
 
+                # 処理中メッセージより先に回答が届かないよう、送信完了を待ってから返信する
+                if thinking_sent is not None:
+                    thinking_sent.result()
+
                 # RAGで回答が得られた場合はそれを返す、そうでなければエスカレーション
                 if rag_answer:
                     response_text = f"{rag_answer}\n\n※この回答はアップロードされた資料から生成されました。"
@@ -2650,12 +2657,12 @@ def get_authenticated_users():
     try:
         from .optimized_auth_flow import OptimizedAuthFlow
         
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
         stats = auth_flow.get_stats()
         
         # 認証済みユーザーの詳細情報を取得
         authenticated_users = []
-        for user_id, auth_info in auth_flow.authenticated_users.items():
+        for user_id, auth_info in auth_flow.get_authenticated_users().items():
             authenticated_users.append({
                 "user_id": hash_user_id(user_id),
                 "store_code": auth_info.get('store_code'),
@@ -2686,7 +2693,7 @@ def force_cache_update():
     try:
         from .optimized_auth_flow import OptimizedAuthFlow
         
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
         auth_flow.force_cache_update()
         
         logger.info("管理者によるキャッシュ強制更新が完了しました")
@@ -2709,7 +2716,7 @@ def check_all_users_status():
     try:
         from .optimized_auth_flow import OptimizedAuthFlow
         
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
         result = auth_flow.check_all_users_status()
         
         if result:
@@ -2747,7 +2754,7 @@ def deauthenticate_user():
             }), 400
 
         user_id = data['user_id']
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
 
         # 認証を取り消し
         success = auth_flow.deauthenticate_user(user_id)
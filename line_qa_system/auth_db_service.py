@@ -4,10 +4,13 @@ Supabaseに認証情報を永続化
 """
 
 import os
-from typing import Optional, Dict, Any, List
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import structlog
 import psycopg2
+from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 
 from .config import Config
@@ -16,13 +19,31 @@ from .utils import hash_user_id
 logger = structlog.get_logger(__name__)
 
 
+class AuthDBError(Exception):
+    """データベースへの問い合わせに失敗した（認証情報が存在しないこととは区別する）"""
+
+
 class AuthDBService:
-    """認証データベースサービス"""
+    """
+    認証データベースサービス
+
+    Webhookを並行に処理するスレッドから共有されるため、接続プールから操作ごとに接続を借りる
+    （一つの接続を共有すると、他のスレッドのcommit/rollbackが処理中のトランザクションに影響する）
+    """
+
+    # 接続プールの接続数
+    POOL_MINCONN = 1
+    POOL_MAXCONN = 10
+    # 接続プールに空きが出るまで待つ最大秒数
+    POOL_WAIT_SECONDS = 5
 
     def __init__(self):
         """初期化"""
         self.database_url = os.getenv('DATABASE_URL')
-        self.connection = None
+        self.pool: Optional[pool.ThreadedConnectionPool] = None
+        # 接続を借りているスレッド数を接続数までに制限する
+        # （ThreadedConnectionPoolは上限に達すると待たずにPoolErrorを送出するため）
+        self._pool_slots = threading.BoundedSemaphore(self.POOL_MAXCONN)
         self.is_enabled = False
 
         if self.database_url:
@@ -37,34 +58,88 @@ class AuthDBService:
             logger.warning("DATABASE_URLが設定されていません。認証データはメモリのみで管理されます")
 
     def _connect(self):
-        """データベースに接続"""
+        """データベースの接続プールを作成"""
         try:
-            self.connection = psycopg2.connect(self.database_url)
+            self.pool = pool.ThreadedConnectionPool(
+                minconn=self.POOL_MINCONN,
+                maxconn=self.POOL_MAXCONN,
+                dsn=self.database_url
+            )
             logger.info("認証データベースに接続しました")
         except Exception as e:
             logger.error("データベース接続エラー", error=str(e))
             raise
 
-    def _ensure_connection(self):
-        """接続が有効か確認し、必要に応じて再接続"""
-        if not self.is_enabled:
-            return False
+    def _ensure_connection(self) -> bool:
+        """
+        接続プールが利用可能か確認
+
+        接続の生存確認（SELECT 1）は行わず、切断された接続は_executeで破棄して再試行する
+        """
+        return self.is_enabled and self.pool is not None
 
+    @contextmanager
+    def _connection(self) -> Iterator[Any]:
+        """
+        接続プールから接続を借りる（空きが無い場合はPOOL_WAIT_SECONDSまで待つ）
+
+        正常終了時はcommit、例外時はrollbackしてから返却する。
+        切断された接続はプールに戻さずに破棄する（次回は新しい接続が作成される）
+        """
+        if not self._pool_slots.acquire(timeout=self.POOL_WAIT_SECONDS):
+            raise pool.PoolError("接続プールの空き待ちがタイムアウトしました")
         try:
-            if self.connection is None or self.connection.closed:
-                self._connect()
-            else:
-                # 接続テスト
-                with self.connection.cursor() as cursor:
-                    cursor.execute("SELECT 1")
-            return True
-        except Exception as e:
-            logger.error("データベース接続確認エラー", error=str(e))
+            conn = self.pool.getconn()
+            discard = False
             try:
-                self._connect()
-                return True
-            except:
-                return False
+                yield conn
+                conn.commit()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                # 接続が切断されている可能性があるため再利用しない
+                discard = True
+                raise
+            except Exception:
+                try:
+                    conn.rollback()
+                    logger.info("ROLLBACK完了")
+                except psycopg2.Error:
+                    discard = True
+                raise
+            finally:
+                self.pool.putconn(conn, close=discard or bool(conn.closed))
+        finally:
+            self._pool_slots.release()
+
+    def _execute(
+        self,
+        query: str,
+        params: tuple = (),
+        fetch: Optional[Callable[[Any], Any]] = None,
+        cursor_factory: Any = None,
+    ) -> Any:
+        """
+        クエリを1件実行してコミット
+
+        アイドル中にサーバー側で切断された接続だった場合は、その接続を破棄して新しい接続で1回だけ再試行する
+
+        Args:
+            query: SQL
+            params: クエリのパラメータ
+            fetch: カーソルから結果を取り出す関数（Noneの場合は結果を返さない）
+            cursor_factory: カーソルの種類（RealDictCursorなど）
+
+        Returns:
+            fetchの戻り値
+        """
+        for attempt in (1, 2):
+            try:
+                with self._connection() as conn, conn.cursor(cursor_factory=cursor_factory) as cursor:
+                    cursor.execute(query, params)
+                    return fetch(cursor) if fetch else None
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if attempt == 2:
+                    raise
+                logger.warning("データベース接続が切断されていたため再接続します", error=str(e))
 
     def save_auth(
         self,
@@ -79,7 +154,7 @@ class AuthDBService:
         logger.info("save_auth呼び出し",
                    user_id=hash_user_id(line_user_id),
                    is_enabled=self.is_enabled,
-                   has_connection=self.connection is not None)
+                   has_pool=self.pool is not None)
 
         if not self._ensure_connection():
             logger.error("データベース接続の確保に失敗しました")
@@ -93,34 +168,32 @@ class AuthDBService:
                         store_code=store_code,
                         staff_id=staff_id)
 
-            with self.connection.cursor() as cursor:
-                # UPSERTクエリ（既存の場合は更新、新規の場合は挿入）
-                query = """
-                INSERT INTO authenticated_users
-                    (line_user_id, store_code, staff_id, staff_name, store_name, auth_time, expires_at, last_activity)
-                VALUES (%s, %s, %s, %s, %s, NOW(), %s, NOW())
-                ON CONFLICT (line_user_id)
-                DO UPDATE SET
-                    store_code = EXCLUDED.store_code,
-                    staff_id = EXCLUDED.staff_id,
-                    staff_name = EXCLUDED.staff_name,
-                    store_name = EXCLUDED.store_name,
-                    auth_time = NOW(),
-                    expires_at = EXCLUDED.expires_at,
-                    last_activity = NOW(),
-                    updated_at = NOW()
-                """
-
-                cursor.execute(query, (
-                    line_user_id,
-                    store_code,
-                    staff_id,
-                    staff_name,
-                    store_name,
-                    expires_at
-                ))
-
-            self.connection.commit()
+            # UPSERTクエリ（既存の場合は更新、新規の場合は挿入）
+            query = """
+            INSERT INTO authenticated_users
+                (line_user_id, store_code, staff_id, staff_name, store_name, auth_time, expires_at, last_activity)
+            VALUES (%s, %s, %s, %s, %s, NOW(), %s, NOW())
+            ON CONFLICT (line_user_id)
+            DO UPDATE SET
+                store_code = EXCLUDED.store_code,
+                staff_id = EXCLUDED.staff_id,
+                staff_name = EXCLUDED.staff_name,
+                store_name = EXCLUDED.store_name,
+                auth_time = NOW(),
+                expires_at = EXCLUDED.expires_at,
+                last_activity = NOW(),
+                updated_at = NOW()
+            """
+
+            self._execute(query, (
+                line_user_id,
+                store_code,
+                staff_id,
+                staff_name,
+                store_name,
+                expires_at
+            ))
+
             logger.info("✅ COMMIT完了")
 
             # 認証ログを記録
@@ -140,49 +213,56 @@ class AuthDBService:
                         error_type=type(e).__name__)
             import traceback
             logger.error("スタックトレース", trace=traceback.format_exc())
-
-            if self.connection:
-                self.connection.rollback()
-                logger.info("ROLLBACK完了")
             return False
 
-    def get_auth(self, line_user_id: str) -> Optional[Dict[str, Any]]:
-        """認証情報を取得"""
+    def get_auth(self, line_user_id: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        認証情報を取得
+
+        Args:
+            line_user_id: LINEユーザーID
+            raise_errors: Trueの場合、問い合わせに失敗したときはNoneを返さずAuthDBErrorを送出する
+
+        Returns:
+            認証情報（存在しない場合はNone）
+        """
         if not self._ensure_connection():
             return None
 
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                query = """
-                SELECT
-                    line_user_id,
-                    store_code,
-                    staff_id,
-                    staff_name,
-                    store_name,
-                    auth_time,
-                    expires_at,
-                    last_activity
-                FROM authenticated_users
-                WHERE line_user_id = %s
-                AND (expires_at IS NULL OR expires_at > NOW())
-                """
-
-                cursor.execute(query, (line_user_id,))
-                result = cursor.fetchone()
-
-                if result:
-                    # 最終アクティビティを更新
-                    self._update_last_activity(line_user_id)
-
-                    return dict(result)
-
-                return None
+            query = """
+            SELECT
+                line_user_id,
+                store_code,
+                staff_id,
+                staff_name,
+                store_name,
+                auth_time,
+                expires_at,
+                last_activity
+            FROM authenticated_users
+            WHERE line_user_id = %s
+            AND (expires_at IS NULL OR expires_at > NOW())
+            """
+
+            result = self._execute(
+                query, (line_user_id,), fetch=lambda cursor: cursor.fetchone(), cursor_factory=RealDictCursor
+            )
+
+            if result:
+                # 最終アクティビティを更新
+                self._update_last_activity(line_user_id)
+
+                return dict(result)
+
+            return None
 
         except Exception as e:
             logger.error("認証情報の取得に失敗しました",
                         user_id=hash_user_id(line_user_id),
                         error=str(e))
+            if raise_errors:
+                raise AuthDBError(str(e)) from e
             return None
 
     def is_authenticated(self, line_user_id: str) -> bool:
@@ -196,11 +276,8 @@ class AuthDBService:
             return False
 
         try:
-            with self.connection.cursor() as cursor:
-                query = "DELETE FROM authenticated_users WHERE line_user_id = %s"
-                cursor.execute(query, (line_user_id,))
-
-            self.connection.commit()
+            query = "DELETE FROM authenticated_users WHERE line_user_id = %s"
+            self._execute(query, (line_user_id,))
 
             # 認証ログを記録
             self._log_auth_action(line_user_id, 'logout', success=True)
@@ -212,22 +289,17 @@ class AuthDBService:
             logger.error("認証情報の削除に失敗しました",
                         user_id=hash_user_id(line_user_id),
                         error=str(e))
-            if self.connection:
-                self.connection.rollback()
             return False
 
     def _update_last_activity(self, line_user_id: str):
         """最終アクティビティ時刻を更新"""
         try:
-            with self.connection.cursor() as cursor:
-                query = """
-                UPDATE authenticated_users
-                SET last_activity = NOW()
-                WHERE line_user_id = %s
-                """
-                cursor.execute(query, (line_user_id,))
-
-            self.connection.commit()
+            query = """
+            UPDATE authenticated_users
+            SET last_activity = NOW()
+            WHERE line_user_id = %s
+            """
+            self._execute(query, (line_user_id,))
 
         except Exception as e:
             logger.debug("最終アクティビティの更新に失敗しました",
@@ -249,23 +321,20 @@ class AuthDBService:
             return
 
         try:
-            with self.connection.cursor() as cursor:
-                query = """
-                INSERT INTO auth_logs
-                    (line_user_id, action, store_code, staff_id, success, error_message)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """
-
-                cursor.execute(query, (
-                    line_user_id,
-                    action,
-                    store_code,
-                    staff_id,
-                    success,
-                    error_message
-                ))
-
-            self.connection.commit()
+            query = """
+            INSERT INTO auth_logs
+                (line_user_id, action, store_code, staff_id, success, error_message)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """
+
+            self._execute(query, (
+                line_user_id,
+                action,
+                store_code,
+                staff_id,
+                success,
+                error_message
+            ))
 
         except Exception as e:
             logger.debug("認証ログの記録に失敗しました", error=str(e))
@@ -277,26 +346,24 @@ class AuthDBService:
             return []
 
         try:
-            with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
-                query = """
-                SELECT
-                    line_user_id,
-                    store_code,
-                    staff_id,
-                    staff_name,
-                    store_name,
-                    auth_time,
-                    expires_at,
-                    last_activity
-                FROM authenticated_users
-                WHERE expires_at IS NULL OR expires_at > NOW()
-                ORDER BY last_activity DESC
-                """
-
-                cursor.execute(query)
-                results = cursor.fetchall()
-
-                return [dict(row) for row in results]
+            query = """
+            SELECT
+                line_user_id,
+                store_code,
+                staff_id,
+                staff_name,
+                store_name,
+                auth_time,
+                expires_at,
+                last_activity
+            FROM authenticated_users
+            WHERE expires_at IS NULL OR expires_at > NOW()
+            ORDER BY last_activity DESC
+            """
+
+            results = self._execute(query, fetch=lambda cursor: cursor.fetchall(), cursor_factory=RealDictCursor)
+
+            return [dict(row) for row in results]
 
         except Exception as e:
             logger.error("認証済みユーザー一覧の取得に失敗しました", error=str(e))
@@ -308,17 +375,13 @@ class AuthDBService:
             return 0
 
         try:
-            with self.connection.cursor() as cursor:
-                query = """
-                DELETE FROM authenticated_users
-                WHERE expires_at IS NOT NULL
-                AND expires_at < NOW()
-                """
+            query = """
+            DELETE FROM authenticated_users
+            WHERE expires_at IS NOT NULL
+            AND expires_at < NOW()
+            """
 
-                cursor.execute(query)
-                deleted_count = cursor.rowcount
-
-            self.connection.commit()
+            deleted_count = self._execute(query, fetch=lambda cursor: cursor.rowcount)
 
             if deleted_count > 0:
                 logger.info("期限切れ認証情報を削除しました", count=deleted_count)
@@ -327,16 +390,22 @@ class AuthDBService:
 
         except Exception as e:
             logger.error("期限切れ認証情報の削除に失敗しました", error=str(e))
-            if self.connection:
-                self.connection.rollback()
             return 0
 
     def health_check(self) -> bool:
-        """ヘルスチェック"""
-        return self._ensure_connection()
+        """ヘルスチェック（実際にクエリを実行して接続を確認）"""
+        if not self._ensure_connection():
+            return False
+
+        try:
+            self._execute("SELECT 1")
+            return True
+        except Exception as e:
+            logger.error("データベース接続確認エラー", error=str(e))
+            return False
 
     def __del__(self):
         """デストラクタ: 接続をクローズ"""
-        if self.connection and not self.connection.closed:
-            self.connection.close()
+        if self.pool is not None and not self.pool.closed:
+            self.pool.closeall()
             logger.debug("認証データベース接続をクローズしました")
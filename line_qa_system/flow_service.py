@@ -3,141 +3,385 @@
 """
 
 import time
-import base64
-import binascii
-import json
-from typing import List, Optional, Dict, Any
+import threading
+import re
+from typing import List, Optional, Dict, Any, Iterator, Tuple, FrozenSet
 from datetime import datetime
 import structlog
-
-import gspread
-from google.oauth2.service_account import Credentials
+from cachetools import TTLCache
+from rapidfuzz import fuzz, process
 
 from .models import FlowItem, ConversationState
 from .config import Config
 from .session_service import SessionService
 from .ai_service import AIService
 from .qa_service import QAService
+from .utils import normalize_text
+from .sheets_client import get_gspread_client
 
 logger = structlog.get_logger(__name__)
 
 
+_ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+# 自然言語フロー検索用のキーワードマッピング（定義順が優先順位）
+FLOW_KEYWORD_MAPPINGS: Dict[str, List[str]] = {
+    "制作依頼": ["制作", "依頼", "動画", "制作したい", "依頼したい", "制作を依頼", "動画制作"],
+    "料金相談": ["料金", "費用", "価格", "お金", "いくら", "料金相談", "費用相談"],
+    "修正相談": ["修正", "変更", "直し", "修正したい", "変更したい", "修正相談"],
+    "プラン相談": ["プラン", "プラン相談", "プランについて", "プランを知りたい"],
+    "サポート": ["サポート", "ヘルプ", "困った", "問題", "エラー", "サポートが必要"],
+    "よくある質問": ["質問", "よくある質問", "FAQ", "疑問", "知りたい"]
+}
+
+# AI文脈判断で「フローに該当しない」と判定された入力を表すキャッシュ値
+_NO_FLOW = "__NONE__"
+
+# キーワード（小文字）からトリガーへのマッピング
+_FLOW_KEYWORD_TO_TRIGGER: Dict[str, str] = {}
+for _trigger, _keywords in FLOW_KEYWORD_MAPPINGS.items():
+    for _keyword in _keywords:
+        _FLOW_KEYWORD_TO_TRIGGER.setdefault(_keyword.lower(), _trigger)
+
+# 全キーワードの先読みパターン（各位置で最長のキーワードを検出）
+_FLOW_KEYWORD_PATTERN = re.compile(
+    "(?=({}))".format(
+        "|".join(
+            re.escape(keyword)
+            for keyword in sorted(_FLOW_KEYWORD_TO_TRIGGER, key=len, reverse=True)
+        )
+    )
+)
+
+
+# Q&Aベース回答の末尾に付ける次のステップの案内
+_QA_RESPONSE_FOOTER = (
+    "\n【次のステップ】\n"
+    "担当者から24時間以内にご連絡いたします。\n"
+    "詳細な見積もりとスケジュールをご提案いたします。\n"
+    "\n"
+    "何かご質問がございましたら、お気軽にお声かけください！\n"
+)
+
+
+def _char_ngrams(text: str, n: int = 2) -> FrozenSet[str]:
+    """文字n-gramの集合を取得（n文字未満の場合は文字列全体）"""
+    text = normalize_text(text).replace(" ", "")
+    if len(text) < n:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _to_int(value: Any, default: Optional[int]) -> Optional[int]:
+    """数値セルを整数に変換（変換できない場合はdefault）"""
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else default
+    text = str(value).strip()
+    if text == "":
+        return default
+    if text.lstrip("-").isdigit():
+        return int(text)
+    return default
+
+
+def _parse_updated_at(value: Any, default: Optional[datetime] = None) -> datetime:
+    """updated_at列を日時に変換（解析できない場合はdefault、未指定時は現在時刻）"""
+    text = str(value) if value else ""
+    if not _ISO_DATE_PATTERN.match(text):
+        return default or datetime.now()
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return default or datetime.now()
+
+
 class FlowService:
     """分岐会話フローサービス"""
 
+    # 初回読み込み中のフローデータを待つ最大秒数
+    LOAD_WAIT_SECONDS = 5
+    # AI判断トリガーをn-gram類似度でマッピングする際のしきい値
+    NGRAM_SIMILARITY_THRESHOLD = 0.4
+
     def __init__(self, session_service: SessionService, qa_service: QAService = None, rag_service=None, ai_service=None):
         """初期化"""
         self.sheet_id = Config.SHEET_ID_QA
         self.session_service = session_service
         self.qa_service = qa_service
         self.rag_service = rag_service
-        self.flows: List[FlowItem] = []
         self.last_updated = datetime.now()
+        # シートの列構成
+        self._columns: Dict[str, int] = {}
+
+        # Google Sheets API・AIサービス・フローデータは初回アクセス時に初期化
+        self._gc = None
+        self._spreadsheet = None
+        self._sheet_modified_time: Optional[str] = None
+        self._ai_service = ai_service
+        self._flows: List[FlowItem] = []
+        self._flows_loaded = False
+        self._load_lock = threading.Lock()
+        # 行間で重複する文字列（トリガー・選択肢）を共有するためのプール
+        self._string_pool: Dict[str, str] = {}
+        # トリガー名から小文字化済みトリガー名へのマッピング
+        self._trigger_lower: Dict[str, str] = {}
+        # (小文字トリガー, ステップ) / ID からフローへのインデックス
+        self._by_trigger_step: Dict[Tuple[str, int], FlowItem] = {}
+        self._by_id: Dict[int, FlowItem] = {}
+        # ステップ1のトリガー名（ソート済み）
+        self._step1_triggers: List[str] = []
+        self._available_triggers_tuple: Tuple[str, ...] = ()
+        self._trigger_ngrams: List[Tuple[str, FrozenSet[str]]] = []
+        self._trigger_prefixes: List[Tuple[str, str]] = []
+        self._available_triggers_csv = ""
+        self._flow_contents_cache = "フロー内容がありません"
+        # AI文脈判断結果のキャッシュ（キー: (正規化した入力, フローデータのバージョン)）
+        # TTLCacheはスレッドセーフではないため、Webhookの処理スレッド間の読み書きはロック内で行う
+        self._ai_trigger_cache = TTLCache(maxsize=2048, ttl=3600)
+        self._ai_trigger_cache_lock = threading.Lock()
+        self._flows_version = 0
+
+    @property
+    def gc(self):
+        """Google Sheetsクライアント（初回アクセス時に初期化）"""
+        if self._gc is None:
+            self._init_google_sheets()
+        return self._gc
+
+    @property
+    def ai_service(self) -> AIService:
+        """AIサービス（外部から渡されていない場合は初回アクセス時に初期化）"""
+        if self._ai_service is None:
+            self._ai_service = AIService()
+        return self._ai_service
+
+    @property
+    def flows(self) -> List[FlowItem]:
+        """フローデータ（初回アクセス時に読み込み）"""
+        self._ensure_loaded()
+        return self._flows
+
+    def _ensure_loaded(self):
+        """フローデータが未読み込みの場合は読み込む（他スレッドが読み込み中の場合は一定時間待機）"""
+        if self._flows_loaded:
+            return
+        if not self._load_lock.acquire(timeout=self.LOAD_WAIT_SECONDS):
+            logger.warning("フローデータの読み込み待ちがタイムアウトしました", timeout=self.LOAD_WAIT_SECONDS)
+            return
+        try:
+            if not self._flows_loaded:
+                self.reload_flows()
+        finally:
+            self._load_lock.release()
 
-        # AIサービスの初期化（外部から渡された場合はそれを使用）
-        if ai_service is None:
-            self.ai_service = AIService()
-        else:
-            self.ai_service = ai_service
-
-        # Google Sheets APIの初期化
-        self._init_google_sheets()
-
-        # 初期データの読み込み
-        self.reload_flows()
+    def start_background_load(self):
+        """フローデータの初回読み込みをバックグラウンドで開始"""
+        thread = threading.Thread(target=self._ensure_loaded, name="flow-preload", daemon=True)
+        thread.start()
 
     def _init_google_sheets(self):
-        """Google Sheets APIの初期化"""
+        """Google Sheets APIの初期化（プロセス内で共有のクライアントを使用）"""
         try:
-            # サービスアカウントJSONの処理
-            service_account_json = Config.GOOGLE_SERVICE_ACCOUNT_JSON
-
-            # Base64エンコードされているかチェック
-            try:
-                # Base64デコードを試行
-                decoded = base64.b64decode(service_account_json)
-                service_account_info = json.loads(decoded)
-            except (binascii.Error, ValueError):
-                # Base64デコードに失敗した場合は、生のJSON文字列として処理
-                service_account_info = json.loads(service_account_json)
-
-            # 認証情報の作成
-            credentials = Credentials.from_service_account_info(
-                service_account_info,
-                scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"],
-            )
-
-            # クライアントの作成
-            self.gc = gspread.authorize(credentials)
+            self._gc = get_gspread_client(readonly=True)
             logger.info("FlowService: Google Sheets APIの初期化が完了しました")
 
         except Exception as e:
             logger.error("FlowService: Google Sheets APIの初期化に失敗しました", error=str(e))
             raise
 
+    def _get_spreadsheet(self):
+        """スプレッドシートを取得（メタデータ取得のRPCを毎回行わないよう再利用）"""
+        if self._spreadsheet is None:
+            self._spreadsheet = self.gc.open_by_key(self.sheet_id)
+        return self._spreadsheet
+
+    def _get_sheet_modified_time(self, spreadsheet) -> Optional[str]:
+        """スプレッドシートの最終更新日時（DriveのmodifiedTime）を取得（取得できない場合はNone）"""
+        try:
+            return spreadsheet.get_lastUpdateTime()
+        except Exception as e:
+            logger.debug("スプレッドシートの更新日時を取得できませんでした", error=str(e))
+            return None
+
     def reload_flows(self):
         """フローデータの再読み込み"""
         try:
             start_time = time.time()
 
-            # スプレッドシートからデータを取得
-            sheet = self.gc.open_by_key(self.sheet_id).worksheet("flows")
-            all_values = sheet.get_all_records()
+            spreadsheet = self._get_spreadsheet()
+
+            # 前回の読み込みから変更がない場合は取得・解析を省略
+            modified_time = self._get_sheet_modified_time(spreadsheet)
+            if (
+                modified_time is not None
+                and modified_time == self._sheet_modified_time
+                and self._flows_loaded
+            ):
+                logger.info("フローデータに変更がないため再読み込みを省略しました", modified_time=modified_time)
+                return
+
+            response = spreadsheet.values_get("flows", params={"majorDimension": "ROWS"})
+            rows = response.get("values", [])
+            if not rows:
+                self._flows = []
+                self._build_indexes()
+                return
+            self._columns = {str(name).strip(): idx for idx, name in enumerate(rows[0])}
+            rows = rows[1:]
+            flows = []
+            self._string_pool = {}
+            self._trigger_lower = {}
 
             # データの変換
-            self.flows = []
-            for row in all_values:
-                try:
-                    # 日時の解析
-                    updated_at_str = row.get("updated_at", "")
-                    if updated_at_str:
-                        try:
-                            updated_at = datetime.fromisoformat(
-                                updated_at_str.replace("Z", "+00:00")
-                            )
-                        except:
-                            updated_at = datetime.now()
-                    else:
-                        updated_at = datetime.now()
-
-                    # end列の処理（TRUE/FALSE文字列をboolに変換）
-                    end_value = row.get("end", "FALSE")
-                    if isinstance(end_value, str):
-                        end_bool = end_value.upper() == "TRUE"
-                    else:
-                        end_bool = bool(end_value)
-
-                    flow_item = FlowItem(
-                        id=int(row.get("id", 0)),
-                        trigger=str(row.get("trigger", "")),
-                        step=int(row.get("step", 1)),
-                        question=str(row.get("question", "")),
-                        options=str(row.get("options", "")),
-                        next_step=str(row.get("next_step", "")),
-                        end=end_bool,
-                        fallback_next=int(row.get("fallback_next", 999)),
-                        updated_at=updated_at,
-                    )
+            skipped_rows = 0
+            for flow_item in self._iter_flow_items(rows):
+                if flow_item is None:
+                    skipped_rows += 1
+                    continue
+                flows.append(flow_item)
 
-                    self.flows.append(flow_item)
+            self._flows = flows
+            self._build_indexes()
+            self._flows_version += 1
+            self._sheet_modified_time = modified_time
 
-                except Exception as e:
-                    logger.warning("フロー行の解析に失敗しました", row=row, error=str(e))
-                    continue
+            if skipped_rows:
+                logger.warning("解析できないフロー行をスキップしました", skipped_rows=skipped_rows)
 
             self.last_updated = datetime.now()
 
             load_time = time.time() - start_time
             logger.info(
                 "フローデータの再読み込みが完了しました",
-                flow_count=len(self.flows),
+                flow_count=len(self._flows),
                 load_time_ms=int(load_time * 1000),
             )
 
         except Exception as e:
             logger.error("フローデータの再読み込みに失敗しました", error=str(e))
             # flowsシートが存在しない場合はエラーにせず空のリストとする
-            self.flows = []
+            self._flows = []
+            self._sheet_modified_time = None
+            self._build_indexes()
+        finally:
+            self._flows_loaded = True
+
+    def _build_indexes(self):
+        """フロー検索用のインデックスを構築"""
+        by_trigger_step: Dict[Tuple[str, int], FlowItem] = {}
+        by_id: Dict[int, FlowItem] = {}
+        for flow in self._flows:
+            trigger_lower = self._trigger_lower.get(flow.trigger) or flow.trigger.lower()
+            # 重複行がある場合は先頭の行を優先
+            by_trigger_step.setdefault((trigger_lower, flow.step), flow)
+            by_id.setdefault(flow.id, flow)
+        self._by_trigger_step = by_trigger_step
+        self._by_id = by_id
+
+        self._step1_triggers = sorted({flow.trigger for flow in self._flows if flow.step == 1})
+
+        # AI判断用のフロー内容・トリガー一覧（各フローの最初のステップのみ）
+        self._available_triggers_tuple = tuple(self._step1_triggers)
+        self._trigger_ngrams = [(trigger, _char_ngrams(trigger)) for trigger in self._step1_triggers]
+        # 正規化したトリガー名（長い順、前方一致用）
+        self._trigger_prefixes = sorted(
+            ((normalize_text(trigger), trigger) for trigger in self._step1_triggers),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._available_triggers_csv = ", ".join(self._step1_triggers)
+        self._flow_contents_cache = "\n".join(
+            f"- {flow.trigger}: {flow.question}" for flow in self._flows if flow.step == 1
+        ) or "フロー内容がありません"
+
+    def _intern(self, value: str) -> str:
+        """同じ内容の文字列は同一オブジェクトを返す"""
+        return self._string_pool.setdefault(value, value)
+
+    def _iter_flow_items(self, rows: List[List[Any]]) -> Iterator[Optional[FlowItem]]:
+        """行データを順に解析してフローアイテムを返す（解析できない行はNone）"""
+        # 読み込み単位で共有する値（現在時刻・同じ文字列の日時の解析結果）
+        now = datetime.now()
+        updated_at_cache: Dict[str, datetime] = {}
+        for row in rows:
+            yield self._parse_row(row, self._columns, now, updated_at_cache)
+
+    @staticmethod
+    def _cell(row: List[Any], columns: Dict[str, int], name: str, default: Any = "") -> Any:
+        """列名に対応するセルの値を取得（列または値が無い場合はdefault）"""
+        idx = columns.get(name)
+        if idx is None:
+            return default
+        if idx >= len(row):
+            return ""
+        return row[idx]
+
+    def _parse_row(
+        self,
+        row: List[Any],
+        columns: Dict[str, int],
+        now: Optional[datetime] = None,
+        updated_at_cache: Optional[Dict[str, datetime]] = None,
+    ) -> Optional[FlowItem]:
+        """
+        シートの1行をフローアイテムに変換
+
+        Args:
+            row: シートの行データ（列順の値リスト）
+            columns: 列名から列番号へのマッピング
+            now: updated_atが解析できない場合に使用する日時
+            updated_at_cache: updated_at文字列の解析結果のキャッシュ
+
+        Returns:
+            フローアイテム（必須項目が欠けている場合はNone）
+        """
+        cell = self._cell
+        trigger = str(cell(row, columns, "trigger")).strip()
+        if not trigger:
+            return None
+        trigger = self._intern(trigger)
+        if trigger not in self._trigger_lower:
+            self._trigger_lower[trigger] = self._intern(trigger.lower())
+
+        flow_id = _to_int(cell(row, columns, "id", 0), None)
+        step = _to_int(cell(row, columns, "step", 1), None)
+        fallback_next = _to_int(cell(row, columns, "fallback_next", 999), None)
+        if flow_id is None or step is None or fallback_next is None:
+            return None
+
+        # updated_at列の処理（同じ文字列は一度だけ解析）
+        updated_at_value = str(cell(row, columns, "updated_at"))
+        if updated_at_cache is None:
+            updated_at = _parse_updated_at(updated_at_value, now)
+        else:
+            updated_at = updated_at_cache.get(updated_at_value)
+            if updated_at is None:
+                updated_at = _parse_updated_at(updated_at_value, now)
+                updated_at_cache[updated_at_value] = updated_at
+
+        # end列の処理（TRUE/FALSE文字列をboolに変換）
+        end_value = cell(row, columns, "end", "FALSE")
+        if isinstance(end_value, str):
+            end_bool = end_value.strip().upper() == "TRUE"
+        else:
+            end_bool = bool(end_value)
+
+        return FlowItem(
+            id=flow_id,
+            trigger=trigger,
+            step=step,
+            question=str(cell(row, columns, "question")),
+            options=self._intern(str(cell(row, columns, "options"))),
+            next_step=str(cell(row, columns, "next_step")),
+            end=end_bool,
+            fallback_next=fallback_next,
+            updated_at=updated_at,
+        )
 
     def get_flow_by_trigger(self, trigger: str, step: int = 1) -> Optional[FlowItem]:
         """
@@ -150,10 +394,8 @@ class FlowService:
         Returns:
             フローアイテム（見つからない場合はNone）
         """
-        for flow in self.flows:
-            if flow.trigger.lower() == trigger.lower() and flow.step == step:
-                return flow
-        return None
+        self._ensure_loaded()
+        return self._by_trigger_step.get((trigger.lower(), step))
 
     def find_flow_by_natural_language(self, user_input: str) -> Optional[FlowItem]:
         """
@@ -165,27 +407,22 @@ class FlowService:
         Returns:
             該当するフローアイテム（見つからない場合はNone）
         """
-        user_input_lower = user_input.lower()
-        
-        # キーワードマッピング
-        keyword_mappings = {
-            "制作依頼": ["制作", "依頼", "動画", "制作したい", "依頼したい", "制作を依頼", "動画制作"],
-            "料金相談": ["料金", "費用", "価格", "お金", "いくら", "料金相談", "費用相談"],
-            "修正相談": ["修正", "変更", "直し", "修正したい", "変更したい", "修正相談"],
-            "プラン相談": ["プラン", "プラン相談", "プランについて", "プランを知りたい"],
-            "サポート": ["サポート", "ヘルプ", "困った", "問題", "エラー", "サポートが必要"],
-            "よくある質問": ["質問", "よくある質問", "FAQ", "疑問", "知りたい"]
+        # 入力中に含まれるキーワードを1回の走査で抽出（重なりも含めて検出）
+        matched_triggers = {
+            _FLOW_KEYWORD_TO_TRIGGER[match.group(1)]
+            for match in _FLOW_KEYWORD_PATTERN.finditer(user_input.lower())
         }
-        
-        # 各トリガーに対してキーワードマッチング
-        for trigger, keywords in keyword_mappings.items():
-            for keyword in keywords:
-                if keyword in user_input_lower:
-                    # ステップ1のフローを取得
-                    flow = self.get_flow_by_trigger(trigger, step=1)
-                    if flow:
-                        logger.info(f"自然言語マッチング成功: '{user_input}' -> '{trigger}'")
-                        return flow
+        if not matched_triggers:
+            return None
+
+        # キーワードマッピングの定義順に優先
+        for trigger in FLOW_KEYWORD_MAPPINGS:
+            if trigger in matched_triggers:
+                # ステップ1のフローを取得
+                flow = self.get_flow_by_trigger(trigger, step=1)
+                if flow:
+                    logger.info(f"自然言語マッチング成功: '{user_input}' -> '{trigger}'")
+                    return flow
         
         return None
 
@@ -209,10 +446,21 @@ class FlowService:
                 return None
             
             # 利用可能なトリガーを取得
-            available_triggers = self.get_available_triggers()
+            self._ensure_loaded()
+            available_triggers = self._available_triggers_tuple
             if not available_triggers:
                 logger.warning("利用可能なトリガーがありません")
                 return None
+
+            # 同じ入力に対する判断結果はキャッシュから返す
+            cache_key = (normalize_text(user_input), self._flows_version)
+            with self._ai_trigger_cache_lock:
+                cached_trigger = self._ai_trigger_cache.get(cache_key)
+            if cached_trigger is not None:
+                logger.debug("AI文脈判断結果をキャッシュから取得しました", trigger=cached_trigger)
+                if cached_trigger == _NO_FLOW:
+                    return None
+                return self.get_flow_by_trigger(cached_trigger, step=1)
             
             # 既存のフロー内容を取得
             flow_contents = self._get_flow_contents_for_ai()
@@ -223,7 +471,7 @@ class FlowService:
 ユーザーの質問を分析して、会話形式のフロー（複数ステップの質問）に該当するか判断してください。
 
 【利用可能なフロー（会話形式の質問）】
-{', '.join(available_triggers)}
+{self._available_triggers_csv}
 
 【フローの詳細】
 {flow_contents}
@@ -254,6 +502,8 @@ class FlowService:
                 # NONEの場合はフローに該当しないと判断
                 if ai_trigger.upper() == "NONE":
                     logger.info("AI判断: フローに該当せず、Q&A検索へ")
+                    with self._ai_trigger_cache_lock:
+                        self._ai_trigger_cache[cache_key] = _NO_FLOW
                     return None
 
                 # 判断結果がそのままトリガーに無い場合でも、文脈で最も近いトリガーにマップする
@@ -261,25 +511,45 @@ class FlowService:
                 if ai_trigger in available_triggers:
                     mapped_trigger = ai_trigger
                 else:
+                    # 全角・半角の違いや後続の説明文を吸収した前方一致
+                    mapped_trigger = self._find_trigger_by_prefix(ai_trigger)
+                    if mapped_trigger:
+                        logger.info(
+                            "AI判断トリガーの前方一致マッピング", ai_trigger=ai_trigger, best_trigger=mapped_trigger
+                        )
+
+                if not mapped_trigger:
                     try:
-                        from rapidfuzz import fuzz
-                        scores = [
-                            (trigger, fuzz.token_set_ratio(ai_trigger, trigger))
-                            for trigger in available_triggers
-                        ]
-                        scores.sort(key=lambda x: x[1], reverse=True)
-                        if scores:
-                            best_trigger, best_score = scores[0]
+                        # しきい値は70程度（柔軟に判定）
+                        best = process.extractOne(
+                            ai_trigger,
+                            available_triggers,
+                            scorer=fuzz.token_set_ratio,
+                            score_cutoff=70,
+                        )
+                        if best is not None:
+                            best_trigger, best_score, _ = best
                             logger.info(
                                 "AI判断トリガーの近傍マッピング", 
                                 ai_trigger=ai_trigger, best_trigger=best_trigger, score=best_score
                             )
-                            # しきい値は70程度（柔軟に判定）
-                            if best_score >= 70:
+                            mapped_trigger = best_trigger
+                        else:
+                            # 文字n-gramの類似度で再判定
+                            ngram_match = self._find_trigger_by_ngram(ai_trigger)
+                            if ngram_match is not None:
+                                best_trigger, similarity = ngram_match
+                                logger.info(
+                                    "AI判断トリガーのn-gramマッピング",
+                                    ai_trigger=ai_trigger, best_trigger=best_trigger, similarity=round(similarity, 3)
+                                )
                                 mapped_trigger = best_trigger
                     except Exception as map_err:
                         logger.warning("トリガーの類似度マッピングに失敗しました", error=str(map_err))
 
+                with self._ai_trigger_cache_lock:
+                    self._ai_trigger_cache[cache_key] = mapped_trigger or _NO_FLOW
+
                 if mapped_trigger:
                     flow = self.get_flow_by_trigger(mapped_trigger, step=1)
                     if flow:
@@ -299,18 +569,55 @@ class FlowService:
         
         return None
 
+    def _find_trigger_by_prefix(self, text: str) -> Optional[str]:
+        """
+        正規化したテキストが最も長く前方一致するトリガーを検索
+
+        Args:
+            text: AIが回答したトリガー名
+
+        Returns:
+            トリガー名（見つからない場合はNone）
+        """
+        normalized = normalize_text(text)
+        if not normalized:
+            return None
+        for normalized_trigger, trigger in self._trigger_prefixes:
+            if normalized_trigger and normalized.startswith(normalized_trigger):
+                return trigger
+        return None
+
+    def _find_trigger_by_ngram(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        文字n-gramのJaccard係数で最も近いトリガーを検索
+
+        Args:
+            text: AIが回答したトリガー名
+
+        Returns:
+            (トリガー名, 類似度)のタプル（しきい値未満の場合はNone）
+        """
+        text_ngrams = _char_ngrams(text)
+        if not text_ngrams:
+            return None
+
+        best: Optional[Tuple[str, float]] = None
+        for trigger, trigger_ngrams in self._trigger_ngrams:
+            union = len(text_ngrams | trigger_ngrams)
+            if not union:
+                continue
+            similarity = len(text_ngrams & trigger_ngrams) / union
+            if best is None or similarity > best[1]:
+                best = (trigger, similarity)
+
+        if best is None or best[1] < self.NGRAM_SIMILARITY_THRESHOLD:
+            return None
+        return best
+
     def _get_flow_contents_for_ai(self) -> str:
-        """AI判断用のフロー内容を取得"""
-        try:
-            flow_contents = []
-            for flow in self.flows:
-                if flow.step == 1:  # 各フローの最初のステップのみ
-                    flow_contents.append(f"- {flow.trigger}: {flow.question}")
-            
-            return "\n".join(flow_contents) if flow_contents else "フロー内容がありません"
-        except Exception as e:
-            logger.error("フロー内容の取得に失敗しました", error=str(e))
-            return "フロー内容の取得に失敗しました"
+        """AI判断用のフロー内容を取得（reload_flows時に構築済みの文字列）"""
+        self._ensure_loaded()
+        return self._flow_contents_cache
 
     def get_flow_by_id(self, flow_id: int) -> Optional[FlowItem]:
         """
@@ -322,10 +629,8 @@ class FlowService:
         Returns:
             フローアイテム（見つからない場合はNone）
         """
-        for flow in self.flows:
-            if flow.id == flow_id:
-                return flow
-        return None
+        self._ensure_loaded()
+        return self._by_id.get(flow_id)
 
     def start_flow(self, user_id: str, trigger: str) -> Optional[FlowItem]:
         """
@@ -345,11 +650,14 @@ class FlowService:
             return None
 
         # 会話状態を作成
+        now = datetime.now()
         state = ConversationState(
             user_id=user_id,
             flow_id=flow.id,
             current_step=1,
             trigger=trigger,
+            started_at=now,
+            last_updated=now,
         )
 
         # セッションに保存
@@ -412,10 +720,11 @@ class FlowService:
             option_index = -1
             selected_option = None
             
-            for i, option in enumerate(options):
-                if option.lower() in choice.lower() or choice.lower() in option.lower():
+            choice_lower = choice.lower()
+            for i, option_lower in enumerate(current_flow.options_lower):
+                if option_lower in choice_lower or choice_lower in option_lower:
                     option_index = i
-                    selected_option = option
+                    selected_option = options[i]
                     break
 
             if option_index == -1:
@@ -514,8 +823,7 @@ class FlowService:
         Returns:
             フロー中の場合はTrue
         """
-        session_data = self.session_service.get_session(user_id)
-        return session_data is not None
+        return self.session_service.has_session(user_id)
 
     def get_available_triggers(self) -> List[str]:
         """
@@ -524,11 +832,8 @@ class FlowService:
         Returns:
             トリガー名のリスト
         """
-        triggers = set()
-        for flow in self.flows:
-            if flow.step == 1:  # ステップ1（開始ステップ）のみ
-                triggers.add(flow.trigger)
-        return sorted(list(triggers))
+        self._ensure_loaded()
+        return list(self._step1_triggers)
 
     def _generate_ai_response(self, state: ConversationState) -> str:
         """AI回答を生成（Q&Aベース）"""
@@ -611,41 +916,27 @@ class FlowService:
         """Q&Aベースの回答を生成"""
         try:
             # 基本の回答テンプレート
-            base_response = f"""
-🎬 {trigger}のご相談ありがとうございます！
+            parts = [f"🎬 {trigger}のご相談ありがとうございます！\n\n【ご選択内容】\n"]
 
-【ご選択内容】
-"""
-            
             # ユーザーの選択を整理
-            for step, choice in user_choices.items():
-                step_num = step.split("_")[1]
-                base_response += f"・ステップ{step_num}: {choice}\n"
-            
-            # Q&Aからの回答を追加
+            parts.extend(
+                f"・ステップ{step.split('_')[1]}: {choice}\n" for step, choice in user_choices.items()
+            )
+
+            # Q&Aからの回答を追加（qa_resultsが辞書の場合にも対応）
             if hasattr(qa_results, 'answer') and qa_results.answer:
-                base_response += f"""
-【詳細情報】
-{qa_results.answer}
-"""
+                qa_answer = qa_results.answer
+            elif isinstance(qa_results, dict) and qa_results.get('answer'):
+                qa_answer = qa_results.get('answer')
             else:
-                # qa_resultsが辞書の場合の処理
-                if isinstance(qa_results, dict) and qa_results.get('answer'):
-                    base_response += f"""
-【詳細情報】
-{qa_results.get('answer')}
-"""
-            
+                qa_answer = None
+            if qa_answer:
+                parts.append(f"\n【詳細情報】\n{qa_answer}\n")
+
             # 次のステップの案内
-            base_response += """
-【次のステップ】
-担当者から24時間以内にご連絡いたします。
-詳細な見積もりとスケジュールをご提案いたします。
+            parts.append(_QA_RESPONSE_FOOTER)
 
-何かご質問がございましたら、お気軽にお声かけください！
-"""
-            
-            return base_response.strip()
+            return "".join(parts).strip()
             
         except Exception as e:
             logger.error("Q&Aベース回答生成中にエラーが発生しました", error=str(e))
@@ -2,19 +2,51 @@
 LINE Messaging API クライアント
 """
 
-import json
+import orjson
 import requests
-from typing import Dict, Any, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 import structlog
+from urllib3.util.retry import Retry
 
 from .config import Config
 
 logger = structlog.get_logger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _build_quick_reply(options: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    クイックリプライオブジェクトを作成（同じ選択肢の組み合わせは再利用）
+
+    フローの各ステップは同じ選択肢で繰り返し返信されるため、
+    選択肢のタプルをキーに構築済みのオブジェクトを共有する。
+    返り値は共有されるため変更しないこと。
+    """
+    items = [
+        {
+            "type": "action",
+            "action": {"type": "message", "label": option, "text": option},
+        }
+        for option in options
+    ]
+    return {"items": items}
+
+
 class LineClient:
     """LINE Messaging API クライアント"""
 
+    # Flexメッセージの固定部分（create_flex_messageで可変部分のみ差し込む）
+    _FLEX_TITLE_TEMPLATE = {"type": "text", "weight": "bold", "size": "lg", "color": "#1DB446"}
+    _FLEX_BODY_TEMPLATE = {"type": "text", "wrap": True, "margin": "md"}
+    _FLEX_TAGS_TEMPLATE = {"type": "text", "size": "sm", "color": "#666666", "margin": "md"}
+    _FLEX_BUTTON_TEMPLATE = {"type": "button", "style": "primary", "color": "#1DB446"}
+
+    # 非同期送信用のワーカー（全インスタンスで共有）
+    _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="line-send")
+
     def __init__(self):
         """初期化"""
         self.channel_access_token = Config.LINE_CHANNEL_ACCESS_TOKEN
@@ -23,6 +55,25 @@ class LineClient:
             "Authorization": f"Bearer {self.channel_access_token}",
             "Content-Type": "application/json",
         }
+        self.reply_url = f"{self.base_url}/bot/message/reply"
+        self.push_url = f"{self.base_url}/bot/message/push"
+        self.profile_url = f"{self.base_url}/bot/profile"
+
+        # 接続を再利用するセッション（TLSハンドシェイクを毎回行わない）
+        # リトライはGETなどの冪等なメソッドのみ（返信・プッシュの二重送信を防ぐ）
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.1,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
 
     def reply_text(
         self, reply_token: str, text: str, quick_reply: Optional[List[str]] = None
@@ -50,12 +101,7 @@ class LineClient:
                 "messages": [message],
             }
 
-            response = requests.post(
-                f"{self.base_url}/bot/message/reply",
-                headers=self.headers,
-                json=payload,
-                timeout=10,
-            )
+            response = self._post_json(self.reply_url, payload)
 
             if response.status_code == 200:
                 logger.info("LINE返信が成功しました", reply_token=reply_token[:10])
@@ -99,12 +145,7 @@ class LineClient:
                 ],
             }
 
-            response = requests.post(
-                f"{self.base_url}/bot/message/reply",
-                headers=self.headers,
-                json=payload,
-                timeout=10,
-            )
+            response = self._post_json(self.reply_url, payload)
 
             if response.status_code == 200:
                 logger.info("LINE Flex返信が成功しました", reply_token=reply_token[:10])
@@ -142,35 +183,19 @@ class LineClient:
         Returns:
             Flexメッセージの内容
         """
-        contents = {
-            "type": "bubble",
-            "body": {
-                "type": "box",
-                "layout": "vertical",
-                "contents": [
-                    {
-                        "type": "text",
-                        "text": title,
-                        "weight": "bold",
-                        "size": "lg",
-                        "color": "#1DB446",
-                    },
-                    {"type": "text", "text": body, "wrap": True, "margin": "md"},
-                ],
-            },
-        }
+        body_contents = [
+            {**self._FLEX_TITLE_TEMPLATE, "text": title},
+            {**self._FLEX_BODY_TEMPLATE, "text": body},
+        ]
 
         # タグがある場合は追加
         if tags:
-            contents["body"]["contents"].append(
-                {
-                    "type": "text",
-                    "text": f"関連: {tags}",
-                    "size": "sm",
-                    "color": "#666666",
-                    "margin": "md",
-                }
-            )
+            body_contents.append({**self._FLEX_TAGS_TEMPLATE, "text": f"関連: {tags}"})
+
+        contents = {
+            "type": "bubble",
+            "body": {"type": "box", "layout": "vertical", "contents": body_contents},
+        }
 
         # URLがある場合はボタンを追加
         if url:
@@ -179,10 +204,8 @@ class LineClient:
                 "layout": "vertical",
                 "contents": [
                     {
-                        "type": "button",
+                        **self._FLEX_BUTTON_TEMPLATE,
                         "action": {"type": "uri", "label": "詳細を見る", "uri": url},
-                        "style": "primary",
-                        "color": "#1DB446",
                     }
                 ],
             }
@@ -203,12 +226,7 @@ class LineClient:
         try:
             payload = {"to": user_id, "messages": [{"type": "text", "text": text}]}
 
-            response = requests.post(
-                f"{self.base_url}/bot/message/push",
-                headers=self.headers,
-                json=payload,
-                timeout=10,
-            )
+            response = self._post_json(self.push_url, payload)
 
             if response.status_code == 200:
                 logger.info("LINEプッシュメッセージが成功しました", user_id=user_id[:10])
@@ -227,6 +245,17 @@ class LineClient:
             )
             return False
 
+    def push_message_async(self, user_id: str, text: str) -> "Future[bool]":
+        """
+        プッシュメッセージをバックグラウンドで送信
+
+        送信完了を待たずに呼び出し元の処理を続行できる。
+
+        Returns:
+            push_messageの結果を返すFuture
+        """
+        return self._executor.submit(self.push_message, user_id, text)
+
     def get_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         ユーザープロフィールを取得
@@ -238,11 +267,7 @@ class LineClient:
             プロフィール情報（失敗時はNone）
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/bot/profile/{user_id}",
-                headers=self.headers,
-                timeout=10,
-            )
+            response = self.session.get(f"{self.profile_url}/{user_id}", timeout=10)
 
             if response.status_code == 200:
                 return response.json()
@@ -266,10 +291,8 @@ class LineClient:
             有効な場合はTrue
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/bot/profile/U1234567890abcdef1234567890abcdef",
-                headers=self.headers,
-                timeout=10,
+            response = self.session.get(
+                f"{self.profile_url}/U1234567890abcdef1234567890abcdef", timeout=10
             )
 
             # 401エラーはトークンが無効、404エラーはユーザーが存在しない（トークンは有効）
@@ -279,6 +302,19 @@ class LineClient:
             logger.error("トークン検証中にエラーが発生しました", error=str(e))
             return False
 
+    def _post_json(self, url: str, payload: Dict[str, Any]) -> requests.Response:
+        """
+        JSONペイロードをPOST
+
+        Args:
+            url: 送信先URL
+            payload: 送信するペイロード
+
+        Returns:
+            レスポンス
+        """
+        return self.session.post(url, data=orjson.dumps(payload), timeout=10)
+
     def _create_quick_reply_items(self, options: List[str]) -> Dict[str, Any]:
         """
         クイックリプライアイテムを作成
@@ -289,12 +325,4 @@ class LineClient:
         Returns:
             クイックリプライオブジェクト
         """
-        items = []
-        for option in options[:13]:  # LINEの制限：最大13個
-            items.append(
-                {
-                    "type": "action",
-                    "action": {"type": "message", "label": option, "text": option},
-                }
-            )
-        return {"items": items}
+        return _build_quick_reply(tuple(options[:13]))  # LINEの制限：最大13個
@@ -3,14 +3,31 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
+from .utils import extract_tags, normalize_text, split_comma_separated
+
+
+def _split_slash_separated(text: str) -> Tuple[str, ...]:
+    """スラッシュ区切りの文字列を分割（全角スラッシュと半角スラッシュの両方に対応）"""
+    if not text:
+        return ()
+    return tuple(part.strip() for part in text.replace("／", "/").split("/") if part.strip())
+
 
 @dataclass
 class QAItem:
     """Q&Aアイテムのデータ構造"""
 
+    # 大量に保持されるためインスタンス辞書を持たない
+    __slots__ = (
+        "id", "question", "keywords", "synonyms", "tags",
+        "answer", "priority", "status", "updated_at",
+        "_keyword_list", "_synonym_list", "_tag_list", "_searchable_texts",
+        "_normalized_texts", "_priority_weight",
+    )
+
     id: int
     question: str
     keywords: str
@@ -33,57 +50,61 @@ class QAItem:
         if self.answer:
             self.answer = self.answer.strip()
 
+        # 検索のたびに参照されるため分割結果を構築時に一度だけ作成する
+        self._keyword_list = tuple(split_comma_separated(self.keywords))
+        self._synonym_list = tuple(split_comma_separated(self.synonyms))
+        self._tag_list = tuple(extract_tags(self.tags))
+
+        # 検索対象となるテキスト（質問文・キーワード・同義語・タグ（#を除去））
+        texts = (self.question,) if self.question else ()
+        self._searchable_texts = texts + self._keyword_list + self._synonym_list + self._tag_list
+        # 検索時に照合する正規化済みテキスト（_searchable_textsと同じ順序）
+        self._normalized_texts = tuple(normalize_text(text) for text in self._searchable_texts)
+        # スコアに掛ける優先度の重み
+        self._priority_weight = 1 + self.priority * 0.05
+
     @property
     def is_active(self) -> bool:
         """アクティブなアイテムかどうか"""
         return self.status.lower() == "active"
 
     @property
-    def keyword_list(self) -> List[str]:
+    def keyword_list(self) -> Tuple[str, ...]:
         """キーワードのリスト"""
-        from .utils import split_comma_separated
-
-        return split_comma_separated(self.keywords)
+        return self._keyword_list
 
     @property
-    def synonym_list(self) -> List[str]:
+    def synonym_list(self) -> Tuple[str, ...]:
         """同義語のリスト"""
-        from .utils import split_comma_separated
-
-        return split_comma_separated(self.synonyms)
+        return self._synonym_list
 
     @property
-    def tag_list(self) -> List[str]:
+    def tag_list(self) -> Tuple[str, ...]:
         """タグのリスト"""
-        from .utils import extract_tags
+        return self._tag_list
 
-        return list(extract_tags(self.tags))
-
-    def get_all_searchable_texts(self) -> List[str]:
+    def get_all_searchable_texts(self) -> Tuple[str, ...]:
         """検索対象となるすべてのテキストを取得"""
-        texts = []
-
-        # 質問文
-        if self.question:
-            texts.append(self.question)
-
-        # キーワード
-        texts.extend(self.keyword_list)
-
-        # 同義語
-        texts.extend(self.synonym_list)
+        return self._searchable_texts
 
-        # タグ（#を除去）
-        for tag in self.tag_list:
-            texts.append(tag)
+    @property
+    def normalized_texts(self) -> Tuple[str, ...]:
+        """正規化済みの検索対象テキスト（get_all_searchable_textsと同じ順序）"""
+        return self._normalized_texts
 
-        return texts
+    @property
+    def priority_weight(self) -> float:
+        """スコアに掛ける優先度の重み"""
+        return self._priority_weight
 
 
 @dataclass
 class SearchResult:
     """検索結果のデータ構造"""
 
+    # 検索のたびに生成されるためインスタンス辞書を持たない
+    __slots__ = ("qa_item", "score", "match_type", "matched_text")
+
     qa_item: QAItem
     score: float
     match_type: str
@@ -114,6 +135,8 @@ class SearchResult:
 class SearchResponse:
     """検索応答のデータ構造"""
 
+    __slots__ = ("is_found", "top_result", "candidates", "total_candidates", "search_time_ms")
+
     is_found: bool
     top_result: Optional[SearchResult]
     candidates: List[SearchResult]
@@ -200,31 +223,35 @@ class FlowItem:
         if self.next_step:
             self.next_step = self.next_step.strip()
 
+        # 選択肢・次ステップは会話中に何度も参照されるため構築時に一度だけ解析する
+        self._option_list = _split_slash_separated(self.options)
+        self._options_lower = tuple(option.lower() for option in self._option_list)
+        try:
+            self._next_step_list = tuple(
+                int(step) for step in _split_slash_separated(self.next_step)
+            )
+        except ValueError:
+            self._next_step_list = ()
+
     @property
     def is_end_step(self) -> bool:
         """終了ステップかどうか"""
         return self.end
 
     @property
-    def option_list(self) -> List[str]:
+    def option_list(self) -> Tuple[str, ...]:
         """選択肢のリスト"""
-        if not self.options:
-            return []
-        # 全角スラッシュと半角スラッシュの両方に対応
-        options_text = self.options.replace("／", "/")
-        return [opt.strip() for opt in options_text.split("/") if opt.strip()]
+        return self._option_list
 
     @property
-    def next_step_list(self) -> List[int]:
+    def options_lower(self) -> Tuple[str, ...]:
+        """小文字化した選択肢（選択肢マッチング用）"""
+        return self._options_lower
+
+    @property
+    def next_step_list(self) -> Tuple[int, ...]:
         """次ステップのリスト"""
-        if not self.next_step:
-            return []
-        try:
-            # 全角スラッシュと半角スラッシュの両方に対応
-            next_step_text = self.next_step.replace("／", "/")
-            return [int(step.strip()) for step in next_step_text.split("/") if step.strip()]
-        except ValueError:
-            return []
+        return self._next_step_list
 
     def get_next_step_for_option(self, option_index: int) -> Optional[int]:
         """
@@ -269,14 +296,20 @@ class ConversationState:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ConversationState":
         """辞書から復元"""
+        started_at = datetime.fromisoformat(data["started_at"])
+        # 開始直後の状態は同じ日時のため再解析しない
+        if data["last_updated"] == data["started_at"]:
+            last_updated = started_at
+        else:
+            last_updated = datetime.fromisoformat(data["last_updated"])
         return cls(
             user_id=data["user_id"],
             flow_id=data["flow_id"],
             current_step=data["current_step"],
             trigger=data["trigger"],
             context=data.get("context", {}),
-            started_at=datetime.fromisoformat(data["started_at"]),
-            last_updated=datetime.fromisoformat(data["last_updated"]),
+            started_at=started_at,
+            last_updated=last_updated,
         )
 
 
@@ -284,6 +317,8 @@ class ConversationState:
 class LocationItem:
     """資料ナビゲーションアイテムのデータ構造（STEP3）"""
 
+    __slots__ = ("id", "category", "title", "url", "description", "tags", "updated_at")
+
     id: int
     category: str
     title: str
@@ -355,3 +390,54 @@ class QAFormLog:
         if not self.keywords:
             return []
         return [kw.strip() for kw in self.keywords.split(",") if kw.strip()]
+
+
+@dataclass(init=False)
+class UserAuthSession:
+    """ユーザーごとの認証状態・入力中データ・認証情報をまとめたデータ構造"""
+
+    # ユーザー数分保持されるためインスタンス辞書を持たない
+    # （__slots__とフィールドの既定値は両立しないため、既定値は__init__で指定）
+    __slots__ = ("state", "store_code", "staff_id", "store_name", "staff_name", "auth_time")
+
+    state: str
+    store_code: Optional[str]
+    staff_id: Optional[str]
+    # 以下は認証完了時にメモリへ保存する認証情報（Redis利用時は未設定）
+    store_name: Optional[str]
+    staff_name: Optional[str]
+    # 認証完了時のUNIX時刻（文字列化はto_auth_infoで行う）
+    auth_time: Optional[float]
+
+    def __init__(
+        self,
+        state: str = "not_started",
+        store_code: Optional[str] = None,
+        staff_id: Optional[str] = None,
+        store_name: Optional[str] = None,
+        staff_name: Optional[str] = None,
+        auth_time: Optional[float] = None,
+    ):
+        self.state = state
+        self.store_code = store_code
+        self.staff_id = staff_id
+        self.store_name = store_name
+        self.staff_name = staff_name
+        self.auth_time = auth_time
+
+    @property
+    def has_auth_info(self) -> bool:
+        """メモリに認証情報を保持しているかどうか"""
+        return self.auth_time is not None
+
+    def to_auth_info(self) -> Dict[str, Any]:
+        """認証情報を辞書形式で取得"""
+        return {
+            "store_code": self.store_code,
+            "staff_id": self.staff_id,
+            "store_name": self.store_name,
+            "staff_name": self.staff_name,
+            "auth_time": datetime.fromtimestamp(self.auth_time).isoformat()
+            if self.auth_time is not None
+            else None,
+        }
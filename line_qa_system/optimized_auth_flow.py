@@ -3,20 +3,65 @@
 キャッシュベースでパフォーマンスを向上
 """
 
+import logging
 import os
+import sys
+import threading
 import time
-import json
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+import orjson
 import structlog
+from cachetools import TLRUCache, TTLCache
 
 from .config import Config
 from .line_client import LineClient
+from .models import UserAuthSession
 from .store_service import StoreService
 from .staff_service import StaffService
 from .utils import hash_user_id
 
 logger = structlog.get_logger(__name__)
+# ログレベルの判定用（structlogはstdlibのロガーに出力を委譲する）
+_stdlib_logger = logging.getLogger(__name__)
+
+
+def _info_enabled() -> bool:
+    """
+    INFOログが出力されるかどうか
+
+    メッセージごとに実行されるログは、出力されない場合に引数の計算（ユーザーIDのハッシュ化など）を省略する
+    """
+    return _stdlib_logger.isEnabledFor(logging.INFO)
+
+
+def _debug_enabled() -> bool:
+    """DEBUGログが出力されるかどうか（_info_enabledと同じ用途）"""
+    return _stdlib_logger.isEnabledFor(logging.DEBUG)
+
+
+# 返信メッセージ
+_MSG_AUTH_START = "認証を開始します。\n\n店舗コードを入力してください。\n例：STORE004"
+_MSG_ALREADY_AUTHENTICATED = "既に認証済みです😊\n\n何でもご質問ください！"
+_MSG_AUTH_REQUIRED = "このBotをご利用いただくには認証が必要です。\n\n「認証」と入力してください。"
+_MSG_AUTH_COMPLETED = (
+    "認証が完了しました！\n\n"
+    "店舗: {store_name}\n"
+    "スタッフ: {staff_name}\n\n"
+    "Botをご利用いただけます。"
+)
+
+# 認証機能の有効・無効（環境変数から読み込んだ値で、実行中は変わらない）
+_AUTH_ENABLED = Config.AUTH_ENABLED
+
+# 共有インスタンスの生成を保護するロック
+_instance_lock = threading.Lock()
+
+# 認証を開始するキーワード（小文字化・前後の空白除去後に照合）
+_AUTH_TRIGGERS = frozenset({"認証", "auth", "ログイン", "login"})
+# これより長いメッセージはキーワードになり得ないため小文字化せずに判定する
+_AUTH_TRIGGER_MAX_LEN = max(len(trigger) for trigger in _AUTH_TRIGGERS)
 
 # Redisクライアントの初期化
 try:
@@ -27,57 +72,260 @@ except ImportError:
     logger.warning("upstash-redisがインストールされていません。メモリベースの認証を使用します。")
 
 
+class _LockedTTLCache:
+    """
+    ロックで保護したTTLCache
+
+    cachetoolsのキャッシュはスレッドセーフではなく、参照時にも期限切れの要素を破棄して内部状態を変更するため、
+    Webhookを並行に処理するスレッドから共有する場合はすべての操作をロック内で行う
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """値を取得（存在しない・期限切れの場合はdefault）"""
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key: str, value: Any):
+        """値を保存"""
+        with self._lock:
+            self._cache[key] = value
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """値を削除して返す"""
+        with self._lock:
+            return self._cache.pop(key, default)
+
+    def add(self, key: str, value: Any) -> bool:
+        """
+        値が存在しない場合のみ保存
+
+        Returns:
+            保存した場合はTrue（既に有効期限内の値がある場合はFalse）
+        """
+        with self._lock:
+            if key in self._cache:
+                return False
+            self._cache[key] = value
+            return True
+
+    def __contains__(self, key: str) -> bool:
+        """有効期限内の値が存在するか"""
+        with self._lock:
+            return key in self._cache
+
+
 class OptimizedAuthFlow:
     """最適化された認証フロー - キャッシュベース"""
 
-    _instance = None
-    _initialized = False
+    _instance: Optional["OptimizedAuthFlow"] = None
+
+    # メモリに保持するユーザーセッションの上限数
+    SESSION_MAXSIZE = 100_000
+    # ユーザーごとの状態遷移を直列化するロックの数（ユーザーIDのハッシュで振り分ける）
+    LOCK_SHARDS = 16
+    # 認証済みと判定した結果を再利用する秒数
+    AUTH_DECISION_TTL = 30
+    # 認証情報が見つからなかった結果を再利用する秒数
+    UNAUTH_DECISION_TTL = 30
+    # データベース・Redisから取得した認証情報をプロセス内に保持する秒数
+    LOCAL_AUTH_INFO_TTL = 60
+    # 未認証ユーザーに認証要求メッセージを再送するまでの秒数
+    AUTH_REQUIRED_REPLY_INTERVAL = 60
+
+    # スプレッドシートへの認証情報書き込み用のワーカー（Sheets APIへの同時リクエスト数を制限）
+    _writer_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="auth-writer")
+    # 店舗・スタッフキャッシュをリクエストの処理と切り離して再読み込みするワーカー
+    _refresh_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth-cache-refresh")
+
+    @classmethod
+    def get_instance(cls) -> "OptimizedAuthFlow":
+        """
+        共有インスタンスを取得（初回呼び出し時に一度だけ初期化）
 
-    def __new__(cls):
-        """シングルトンパターン"""
-        if cls._instance is None:
-            cls._instance = super(OptimizedAuthFlow, cls).__new__(cls)
-        return cls._instance
+        同時に呼び出されてもサービスが二重に初期化されないようロックで保護する
+        """
+        instance = cls._instance
+        if instance is None:
+            with _instance_lock:
+                instance = cls._instance
+                if instance is None:
+                    instance = cls._instance = cls()
+        return instance
 
     def __init__(self):
-        """初期化（一度だけ実行）"""
-        if not self._initialized:
-            self.line_client = LineClient()
-            self.store_service = StoreService()
-            self.staff_service = StaffService()
+        """初期化"""
+        self.line_client = LineClient()
+        self.store_service = StoreService()
+        self.staff_service = StaffService()
 
-            # Redis設定の確認
-            redis_url = os.environ.get("REDIS_URL")
-            redis_token = os.environ.get("REDIS_TOKEN")
+        # Redis設定の確認
+        redis_url = os.environ.get("REDIS_URL")
+        redis_token = os.environ.get("REDIS_TOKEN")
 
-            # Redisクライアントの初期化
-            self.redis_client = None
-            self.use_redis = False
+        # Redisクライアントの初期化
+        self.redis_client = None
+        self.use_redis = False
 
-            if REDIS_AVAILABLE and redis_url and redis_token:
-                try:
-                    self.redis_client = Redis(url=redis_url, token=redis_token)
-                    self.use_redis = True
-                    logger.info("Redis認証ストレージを初期化しました", redis_url=redis_url[:20] + "...")
-                except Exception as e:
-                    logger.warning("Redis初期化に失敗しました。メモリベースを使用します。", error=str(e))
-                    self.use_redis = False
-            else:
-                logger.info("Redis設定が見つかりません。メモリベースの認証を使用します。")
+        if REDIS_AVAILABLE and redis_url and redis_token:
+            try:
+                self.redis_client = Redis(url=redis_url, token=redis_token)
+                self.use_redis = True
+                logger.info("Redis認証ストレージを初期化しました", redis_url=redis_url[:20] + "...")
+            except Exception as e:
+                logger.warning("Redis初期化に失敗しました。メモリベースを使用します。", error=str(e))
+                self.use_redis = False
+        else:
+            logger.info("Redis設定が見つかりません。メモリベースの認証を使用します。")
+
+        # 認証状態の管理（メモリ内）
+        # ユーザーID -> 認証状態・一時データ・認証情報（Redisが無効な場合のフォールバック）
+        # 有効期限（_session_ttu）を過ぎたセッションは自動的に破棄される
+        self.sessions: TLRUCache = TLRUCache(
+            maxsize=self.SESSION_MAXSIZE,
+            ttu=self._session_ttu,
+        )
+
+        # 同じユーザーの状態遷移を直列化するロック（ユーザー間では並行に処理できる）
+        self._user_locks = tuple(threading.RLock() for _ in range(self.LOCK_SHARDS))
+        # セッションキャッシュ本体の読み書きを保護するロック
+        self._sessions_lock = threading.Lock()
+
+        # キャッシュ管理
+        self.cache_expiry = 300  # 5分間のキャッシュ
+        self.last_cache_update = 0
+        self.cache_valid = False
+        # 店舗・スタッフキャッシュの世代（再読み込みのたびに更新）
+        self._staff_cache_gen = 0
+        # 店舗・スタッフキャッシュの再読み込みを1スレッドに限定するロック
+        self._refresh_lock = threading.Lock()
+
+        # ユーザーID -> 認証済みと判定した時点のキャッシュ世代
+        # 同じ世代のスタッフ情報で確認済みの間は、メッセージごとの再確認を省略する
+        self._auth_decisions = _LockedTTLCache(
+            maxsize=self.SESSION_MAXSIZE,
+            ttl=self.AUTH_DECISION_TTL,
+        )
+
+        # 認証情報が見つからなかったユーザーID（未認証のまま連投された場合の再確認を省略する）
+        self._unauth_decisions = _LockedTTLCache(
+            maxsize=self.SESSION_MAXSIZE,
+            ttl=self.UNAUTH_DECISION_TTL,
+        )
+
+        # ユーザーID -> データベース・Redisから取得した認証情報
+        # 認証済みユーザーの連続したメッセージでは外部への問い合わせを省略する
+        self._local_auth_info = _LockedTTLCache(
+            maxsize=self.SESSION_MAXSIZE,
+            ttl=self.LOCAL_AUTH_INFO_TTL,
+        )
+
+        # ユーザーID -> 認証要求メッセージを送信した時刻
+        # 未認証のまま連投された場合にLINE APIの呼び出しが重ならないようにする
+        self._auth_required_replied = _LockedTTLCache(
+            maxsize=self.SESSION_MAXSIZE,
+            ttl=self.AUTH_REQUIRED_REPLY_INTERVAL,
+        )
+
+        # 認証データベースサービス（初回利用時に接続プールを作成し、以降は再利用する）
+        self._auth_db = None
+        self._auth_db_lock = threading.Lock()
+
+        # 認証状態 -> ハンドラーの対応表
+        self._handlers: Dict[str, Callable[[str, str, str], bool]] = {
+            'store_code_input_pending': self._handle_store_code_state,
+            'staff_id_input_pending': self._handle_staff_id_state,
+            'staff_id_input_completed': self._handle_staff_id_completed_state,
+        }
 
-            # 認証状態の管理（メモリ内）
-            self.auth_states = {}  # ユーザーID -> 認証状態
-            self.temp_data = {}    # ユーザーID -> 一時データ
-            self.authenticated_users = {}  # ユーザーID -> 認証情報（Redisが無効な場合のフォールバック）
+        storage_type = "Redis" if self.use_redis else "Memory"
+        logger.info(f"最適化認証フローを初期化しました（{storage_type}ベース）")
 
-            # キャッシュ管理
-            self.cache_expiry = 300  # 5分間のキャッシュ
-            self.last_cache_update = 0
-            self.cache_valid = False
+    def _get_auth_db(self):
+        """
+        共有の認証データベースサービスを取得
 
-            self._initialized = True
-            storage_type = "Redis" if self.use_redis else "Memory"
-            logger.info(f"最適化認証フローを初期化しました（{storage_type}ベース）")
+        呼び出しのたびに接続を張り直すとメッセージごとに往復が増えるため、
+        プロセス内で一つのサービス（接続プール）を共有する
+        """
+        auth_db = self._auth_db
+        if auth_db is None:
+            with self._auth_db_lock:
+                auth_db = self._auth_db
+                if auth_db is None:
+                    from .auth_db_service import AuthDBService
+                    auth_db = self._auth_db = AuthDBService()
+        return auth_db
+
+    def _lock_for(self, user_id: str) -> threading.RLock:
+        """ユーザーに対応するロックを取得"""
+        return self._user_locks[hash(user_id) % self.LOCK_SHARDS]
+
+    @staticmethod
+    def _session_ttu(user_id: str, session: UserAuthSession, now: float) -> float:
+        """
+        セッションの有効期限を計算（保存した時点から数える）
+
+        認証済みのセッションは認証の有効期間（Redisと同じ）、
+        入力途中などのセッションはAUTH_TIMEOUT秒で破棄する
+        """
+        if session.state == 'authenticated':
+            return now + Config.AUTH_SESSION_DAYS * 24 * 60 * 60
+        return now + Config.AUTH_TIMEOUT
+
+    def _put_session(self, user_id: str, session: UserAuthSession):
+        """セッションを保存（有効期限を数え直す）"""
+        with self._sessions_lock:
+            self.sessions[user_id] = session
+
+    def _find_session(self, user_id: str) -> Optional[UserAuthSession]:
+        """
+        ユーザーの認証セッションを取得（存在しない場合はNone）
+
+        TLRUCacheは参照時にも期限切れのセッションを破棄して内部状態を変更するため、読み取りもロック内で行う
+        """
+        with self._sessions_lock:
+            return self.sessions.get(user_id)
+
+    def _snapshot_sessions(self) -> List[Tuple[str, UserAuthSession]]:
+        """全セッションの一覧をコピーして取得（走査中に他のスレッドが変更しても影響を受けない）"""
+        with self._sessions_lock:
+            return list(self.sessions.items())
+
+    def _get_state(self, user_id: str) -> str:
+        """ユーザーの認証状態を取得"""
+        session = self._find_session(user_id)
+        return session.state if session else 'not_started'
+
+    def _get_session(self, user_id: str) -> UserAuthSession:
+        """ユーザーの認証セッションを取得（存在しない場合は作成）"""
+        with self._sessions_lock:
+            session = self.sessions.get(user_id)
+            if session is None:
+                session = self.sessions[user_id] = UserAuthSession()
+            return session
+
+    def _transition(self, user_id: str, expected_state: str, **changes: Any) -> Optional[UserAuthSession]:
+        """
+        セッションが expected_state のままであれば changes を反映して保存
+
+        状態の確認と変更のみをユーザーのロック内で行い、データベース・Redisへの問い合わせや
+        LINEへの返信はロックの外で行う（同じロックを共有する他のユーザーを待たせない）
+
+        Returns:
+            更新したセッション（同時に届いた別のメッセージで状態が変わっていた場合はNone）
+        """
+        with self._lock_for(user_id):
+            session = self._get_session(user_id)
+            if session.state != expected_state:
+                return None
+            for name, value in changes.items():
+                setattr(session, name, value)
+            self._put_session(user_id, session)
+            return session
 
     def _is_cache_valid(self) -> bool:
         """キャッシュが有効かチェック"""
@@ -87,25 +335,54 @@ class OptimizedAuthFlow:
         current_time = time.time()
         return (current_time - self.last_cache_update) < self.cache_expiry
 
-    def _update_cache_if_needed(self):
-        """必要に応じてキャッシュを更新"""
-        if not self._is_cache_valid():
-            try:
-                logger.info("キャッシュを更新しています...")
-                self.store_service.load_stores_from_sheet()
-                self.staff_service.load_staff_data()
-                self.last_cache_update = time.time()
-                self.cache_valid = True
-                logger.info("キャッシュの更新が完了しました")
-            except Exception as e:
-                logger.error("キャッシュの更新に失敗しました", error=str(e))
-                # エラーが発生してもキャッシュは無効化しない
+    def _update_cache_if_needed(self, force: bool = False):
+        """
+        必要に応じてキャッシュを更新（同時に呼ばれても再読み込みは1回のみ）
+
+        Args:
+            force: Trueの場合は有効期限内でも再読み込みする
+        """
+        if not force and self._is_cache_valid():
+            return
+
+        # 他のスレッドが更新中の場合、読み込み済みのデータがあれば待たずにそれを使う
+        if not self._refresh_lock.acquire(blocking=force or self.last_cache_update == 0):
+            return
+        try:
+            # ロック待ちの間に他のスレッドが更新済みであれば何もしない
+            if not force and self._is_cache_valid():
+                return
+            logger.info("キャッシュを更新しています...")
+            self.store_service.load_stores_from_sheet()
+            self.staff_service.load_staff_data()
+            self.last_cache_update = time.time()
+            self.cache_valid = True
+            self._staff_cache_gen += 1
+            logger.info("キャッシュの更新が完了しました")
+        except Exception as e:
+            logger.error("キャッシュの更新に失敗しました", error=str(e))
+            # エラーが発生してもキャッシュは無効化しない
+        finally:
+            self._refresh_lock.release()
     
+    def _update_cache_in_background(self):
+        """
+        キャッシュが古い場合はバックグラウンドで更新
+
+        読み込み済みのデータがある間は古いデータで処理を続け、
+        シートの再読み込みを待たない（未読み込みの場合のみ同期的に読み込む）
+        """
+        if self._is_cache_valid():
+            return
+        if self.last_cache_update == 0:
+            self._update_cache_if_needed()
+        elif not self._refresh_lock.locked():
+            self._refresh_pool.submit(self._update_cache_if_needed)
+
     def force_cache_update(self):
         """キャッシュを強制更新"""
         logger.info("キャッシュを強制更新します...")
-        self.cache_valid = False
-        self._update_cache_if_needed()
+        self._update_cache_if_needed(force=True)
         logger.info("キャッシュの強制更新が完了しました")
 
     def process_auth_flow(self, event: Dict[str, Any]) -> bool:
@@ -118,91 +395,112 @@ class OptimizedAuthFlow:
             message_text = event["message"]["text"]
             reply_token = event["replyToken"]
 
-            hashed_user_id = hash_user_id(user_id)
-
             # 認証が有効でない場合は何もしない
-            if not Config.AUTH_ENABLED:
+            if not _AUTH_ENABLED:
                 return False
 
-            # キャッシュを更新（必要に応じて）
-            self._update_cache_if_needed()
-
             # 現在の認証状態を取得
-            current_state = self.auth_states.get(user_id, 'not_started')
+            # （状態の変更は各ハンドラーがユーザーのロック内で行い、外部への問い合わせ中はロックを保持しない）
+            current_state = self._get_state(user_id)
 
-            logger.info("最適化認証フロー処理中",
-                        user_id=hashed_user_id,
-                        current_state=current_state,
-                        message_text=message_text,
-                        cache_valid=self._is_cache_valid())
+            if _info_enabled():
+                logger.info("最適化認証フロー処理中",
+                            user_id=hash_user_id(user_id),
+                            current_state=current_state,
+                            message_text=message_text,
+                            cache_valid=self._is_cache_valid())
 
             # 認証開始（「認証」というキーワードが送信された場合）
-            if message_text.strip().lower() in ["認証", "auth", "ログイン", "login"]:
-                # 既に認証済みであれば案内メッセージを送信
-                if self.is_authenticated(user_id):
-                    logger.debug("ユーザーは既に認証済みです", user_id=hashed_user_id)
-                    self.line_client.reply_text(reply_token, "既に認証済みです😊\n\n何でもご質問ください！")
-                    return True
-                # 未認証の場合は認証フローを開始
-                self.start_auth(user_id, reply_token)
-                return True
+            stripped_text = message_text.strip()
+            if len(stripped_text) <= _AUTH_TRIGGER_MAX_LEN and stripped_text.lower() in _AUTH_TRIGGERS:
+                return self._handle_auth_trigger(user_id, message_text, reply_token)
 
-            # 店舗コード入力
-            elif current_state == 'store_code_input_pending':
-                result = self.handle_store_code_input(user_id, message_text, reply_token)
-                logger.info("店舗コード入力処理完了",
-                           user_id=hashed_user_id,
-                           result=result,
-                           new_state=self.auth_states.get(user_id, 'not_started'))
-                return result
-
-            # 社員番号入力
-            elif current_state == 'staff_id_input_pending':
-                result = self.handle_staff_id_input(user_id, message_text, reply_token)
-                logger.info("社員番号入力処理完了",
-                           user_id=hashed_user_id,
-                           result=result,
-                           new_state=self.auth_states.get(user_id, 'not_started'))
-
-                # 認証状態が更新された場合は、次のステップを実行
-                if self.auth_states.get(user_id) == 'staff_id_input_completed':
-                    logger.info("社員番号入力完了、認証最終化を実行します",
-                               user_id=hashed_user_id)
-                    return self.finalize_auth(user_id, reply_token)
-
-                return result
-
-            # 社員番号入力完了後の認証処理
-            elif current_state == 'staff_id_input_completed':
-                # 認証完了処理を実行
-                return self.finalize_auth(user_id, reply_token)
-
-            # 認証済みユーザーの通常メッセージは認証フローで処理しない
-            elif self.is_authenticated(user_id):
-                logger.debug("認証済みユーザーのメッセージは通常処理へ", user_id=hashed_user_id)
-                return False  # 認証フローで処理せず、通常のQ&A処理に進む
-
-            # その他の場合（未認証）は認証が必要
-            else:
-                logger.debug("未認証ユーザーに認証要求メッセージを送信", user_id=hashed_user_id)
-                self.send_auth_required_message(reply_token)
-                return True
+            # 入力待ち以外（認証済み・未認証）の場合
+            handler = self._handlers.get(current_state)
+            if handler is None:
+                return self._handle_other_state(user_id, message_text, reply_token)
+
+            # 入力値の確認に店舗・スタッフ情報を使うため、必要に応じてキャッシュを更新
+            self._update_cache_if_needed()
+
+            # 認証状態に対応するハンドラーを実行
+            return handler(user_id, message_text, reply_token)
 
         except Exception as e:
             logger.error("最適化認証フローの処理に失敗しました", error=str(e))
             return False
 
+    def _handle_auth_trigger(self, user_id: str, message_text: str, reply_token: str) -> bool:
+        """認証キーワードを処理"""
+        # 既に認証済みであれば案内メッセージを送信
+        if self.is_authenticated(user_id):
+            logger.debug("ユーザーは既に認証済みです", user_id=hash_user_id(user_id))
+            self.line_client.reply_text(reply_token, _MSG_ALREADY_AUTHENTICATED)
+            return True
+        # 未認証の場合は認証フローを開始
+        self.start_auth(user_id, reply_token)
+        return True
+
+    def _handle_store_code_state(self, user_id: str, message_text: str, reply_token: str) -> bool:
+        """店舗コード入力待ちの状態を処理"""
+        result = self.handle_store_code_input(user_id, message_text, reply_token)
+        if _info_enabled():
+            logger.info("店舗コード入力処理完了",
+                       user_id=hash_user_id(user_id),
+                       result=result,
+                       new_state=self._get_state(user_id))
+        return result
+
+    def _handle_staff_id_state(self, user_id: str, message_text: str, reply_token: str) -> bool:
+        """社員番号入力待ちの状態を処理"""
+        result = self.handle_staff_id_input(user_id, message_text, reply_token)
+        new_state = self._get_state(user_id)
+        if _info_enabled():
+            logger.info("社員番号入力処理完了",
+                       user_id=hash_user_id(user_id),
+                       result=result,
+                       new_state=new_state)
+
+        # 認証状態が更新された場合は、次のステップを実行
+        if new_state == 'staff_id_input_completed':
+            logger.info("社員番号入力完了、認証最終化を実行します",
+                       user_id=hash_user_id(user_id))
+            return self.finalize_auth(user_id, reply_token)
+
+        return result
+
+    def _handle_staff_id_completed_state(self, user_id: str, message_text: str, reply_token: str) -> bool:
+        """社員番号入力完了後の認証処理"""
+        return self.finalize_auth(user_id, reply_token)
+
+    def _handle_other_state(self, user_id: str, message_text: str, reply_token: str) -> bool:
+        """入力待ち以外の状態を処理（認証済みなら通常処理へ、未認証なら認証を要求）"""
+        # 認証済みユーザーの通常メッセージは認証フローで処理しない
+        # （ステータスの失効を検知するため、'authenticated' 状態でも毎回確認する）
+        if self.is_authenticated(user_id):
+            if _debug_enabled():
+                logger.debug("認証済みユーザーのメッセージは通常処理へ", user_id=hash_user_id(user_id))
+            return False  # 認証フローで処理せず、通常のQ&A処理に進む
+
+        # その他の場合（未認証）は認証が必要
+        # 直近に案内済みの場合は返信せず、メッセージの処理のみ終える
+        # （確認と記録を一度に行い、同時に届いたメッセージで重複して送信しない）
+        if not self._auth_required_replied.add(user_id, time.monotonic()):
+            if _debug_enabled():
+                logger.debug("認証要求メッセージは送信済みのため省略", user_id=hash_user_id(user_id))
+            return True
+
+        logger.debug("未認証ユーザーに認証要求メッセージを送信", user_id=hash_user_id(user_id))
+        self.send_auth_required_message(reply_token)
+        return True
+
     def start_auth(self, user_id: str, reply_token: str):
         """認証を開始"""
         try:
-            self.auth_states[user_id] = 'store_code_input_pending'
-            self.temp_data[user_id] = {}
+            with self._lock_for(user_id):
+                self._put_session(user_id, UserAuthSession(state='store_code_input_pending'))
             
-            message = "認証を開始します。\n\n" \
-                    "店舗コードを入力してください。\n" \
-                    "例：STORE004"
-            
-            self.line_client.reply_text(reply_token, message)
+            self.line_client.reply_text(reply_token, _MSG_AUTH_START)
             logger.info("認証を開始しました", user_id=hash_user_id(user_id))
             
         except Exception as e:
@@ -226,11 +524,12 @@ class OptimizedAuthFlow:
                     f"店舗「{store['store_name']}」は現在利用できません。\n\n管理者にお問い合わせください。")
                 return True
 
-            # 店舗コードを一時保存
-            self.temp_data[user_id]['store_code'] = store_code
-            
-            # 認証状態を更新
-            self.auth_states[user_id] = 'staff_id_input_pending'
+            # 店舗コードを一時保存し、認証状態を更新
+            session = self._transition(user_id, 'store_code_input_pending',
+                                       store_code=store_code, state='staff_id_input_pending')
+            if session is None:
+                # 同時に届いた別のメッセージで処理済み
+                return True
             
             # 社員番号入力を促す
             message = f"店舗「{store['store_name']}」を確認しました。\n\n" \
@@ -256,14 +555,15 @@ class OptimizedAuthFlow:
             staff_id = message_text.strip()
             
             # 店舗コードを取得
-            store_code = self.temp_data.get(user_id, {}).get('store_code')
+            session = self._find_session(user_id)
+            store_code = session.store_code if session else None
             if not store_code:
                 self.line_client.reply_text(reply_token, 
                     "店舗コードが見つかりません。\n\n最初から認証をやり直してください。")
                 return True
 
-            # スタッフの存在確認（キャッシュから）
-            staff = self.staff_service.get_staff(store_code, staff_id)
+            # スタッフ・店舗情報を取得し、スタッフの存在を確認（キャッシュから）
+            store, staff = self._get_store_and_staff(store_code, staff_id)
             if not staff:
                 self.line_client.reply_text(reply_token, 
                     f"社員番号「{staff_id}」が見つかりません。\n\n正しい社員番号を入力してください。")
@@ -274,65 +574,26 @@ class OptimizedAuthFlow:
                     f"スタッフ「{staff['staff_name']}」は現在利用できません。\n\n管理者にお問い合わせください。")
                 return True
             
-            # 認証状態を社員番号入力完了に更新
-            self.auth_states[user_id] = 'staff_id_input_completed'
+            # 認証状態を社員番号入力完了に更新し、社員番号を一時保存
+            session = self._transition(user_id, 'staff_id_input_pending',
+                                       state='staff_id_input_completed', staff_id=staff_id)
+            if session is None:
+                # 同時に届いた別のメッセージで処理済み
+                return True
             logger.info("社員番号入力完了、認証状態を更新しました", 
                        user_id=hash_user_id(user_id), 
                        store_code=store_code, 
                        staff_id=staff_id,
-                       new_state=self.auth_states.get(user_id))
-            
-            # 一時データに社員番号を保存
-            if user_id not in self.temp_data:
-                self.temp_data[user_id] = {}
-            self.temp_data[user_id]['staff_id'] = staff_id
+                       new_state=session.state)
 
-            # 店舗情報を取得
-            store = self.store_service.get_store(store_code)
+            # 店舗情報を確認
             if not store:
                 self.line_client.reply_text(reply_token, 
                     "店舗情報の取得に失敗しました。\n\n最初から認証をやり直してください。")
                 return True
 
-            # 認証完了
-            logger.info("認証完了処理を開始します", 
-                       user_id=hash_user_id(user_id), 
-                       store_code=store_code, 
-                       staff_id=staff_id)
-            
-            try:
-                self.complete_auth(user_id, store_code, staff_id, store, staff)
-                logger.info("認証完了処理が成功しました", 
-                           user_id=hash_user_id(user_id))
-            except Exception as e:
-                logger.error("認証完了処理でエラーが発生しました", 
-                           user_id=hash_user_id(user_id), 
-                           error=str(e))
-                self.line_client.reply_text(reply_token, 
-                    "認証の完了処理中にエラーが発生しました。再度お試しください。")
-                return True
-            
-            # 認証状態を完了に設定
-            self.auth_states[user_id] = 'authenticated'
-            
-            logger.info("認証状態を完了に設定しました", 
-                       user_id=hash_user_id(user_id), 
-                       final_auth_state=self.auth_states.get(user_id),
-                       is_authenticated=self.is_authenticated(user_id))
-            
-            success_message = f"認証が完了しました！\n\n" \
-                            f"店舗: {store['store_name']}\n" \
-                            f"スタッフ: {staff['staff_name']}\n\n" \
-                            f"Botをご利用いただけます。"
-            
-            self.line_client.reply_text(reply_token, success_message)
-            logger.info("認証が完了しました", 
-                       user_id=hash_user_id(user_id), 
-                       store_code=store_code, 
-                       staff_id=staff_id,
-                       final_auth_state=self.auth_states.get(user_id),
-                       is_authenticated=self.is_authenticated(user_id))
-            return True
+            # 取得済みの店舗・スタッフ情報で認証を完了（再取得しない）
+            return self.finalize_auth(user_id, reply_token, store, staff)
 
         except Exception as e:
             logger.error("社員番号入力の処理に失敗しました", error=str(e))
@@ -340,13 +601,25 @@ class OptimizedAuthFlow:
                 "社員番号の処理中にエラーが発生しました。再度お試しください。")
             return True
     
-    def finalize_auth(self, user_id: str, reply_token: str) -> bool:
-        """認証を最終化"""
+    def _get_store_and_staff(
+        self, store_code: str, staff_id: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """店舗情報とスタッフ情報をまとめて取得（キャッシュから）"""
+        return self.store_service.get_store(store_code), self.staff_service.get_staff(store_code, staff_id)
+
+    def finalize_auth(
+        self,
+        user_id: str,
+        reply_token: str,
+        store: Optional[Dict[str, Any]] = None,
+        staff: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """認証を最終化（店舗・スタッフ情報が渡されない場合はキャッシュから取得）"""
         try:
             # 一時データから認証情報を取得
-            temp_data = self.temp_data.get(user_id, {})
-            store_code = temp_data.get('store_code')
-            staff_id = temp_data.get('staff_id')
+            session = self._find_session(user_id)
+            store_code = session.store_code if session else None
+            staff_id = session.staff_id if session else None
             
             if not store_code or not staff_id:
                 self.line_client.reply_text(reply_token, 
@@ -354,32 +627,27 @@ class OptimizedAuthFlow:
                 return True
             
             # スタッフと店舗情報を再取得
-            staff = self.staff_service.get_staff(store_code, staff_id)
-            store = self.store_service.get_store(store_code)
+            if store is None or staff is None:
+                store, staff = self._get_store_and_staff(store_code, staff_id)
             
             if not staff or not store:
                 self.line_client.reply_text(reply_token, 
                     "認証情報の取得に失敗しました。\n\n最初から認証をやり直してください。")
                 return True
             
-            # 認証完了処理を実行
+            # 認証完了処理を実行（認証状態も完了に設定される）
             self.complete_auth(user_id, store_code, staff_id, store, staff)
-            
-            # 認証状態を完了に設定
-            self.auth_states[user_id] = 'authenticated'
-            
-            success_message = f"認証が完了しました！\n\n" \
-                            f"店舗: {store['store_name']}\n" \
-                            f"スタッフ: {staff['staff_name']}\n\n" \
-                            f"Botをご利用いただけます。"
+
+            success_message = _MSG_AUTH_COMPLETED.format(
+                store_name=store['store_name'], staff_name=staff['staff_name']
+            )
             
             self.line_client.reply_text(reply_token, success_message)
             logger.info("認証が完了しました", 
                        user_id=hash_user_id(user_id), 
                        store_code=store_code, 
                        staff_id=staff_id,
-                       final_auth_state=self.auth_states.get(user_id),
-                       is_authenticated=self.is_authenticated(user_id))
+                       final_auth_state=self._get_state(user_id))
             return True
             
         except Exception as e:
@@ -389,9 +657,14 @@ class OptimizedAuthFlow:
             return True
 
     def complete_auth(self, user_id: str, store_code: str, staff_id: str, store: Dict, staff: Dict):
-        """認証を完了"""
+        """
+        認証を完了
+
+        データベース・Redisへの保存はロックの外で行い、キャッシュの無効化と認証状態の更新のみをユーザーのロック内で行う
+        """
         try:
-            auth_time = datetime.now().isoformat()
+            # 日時の文字列化は必要になった時点で行う（返信までの処理を軽くする）
+            auth_time = time.time()
 
             auth_data = {
                 'store_code': store_code,
@@ -403,8 +676,7 @@ class OptimizedAuthFlow:
 
             # 1. データベースに永続化（最優先）
             try:
-                from .auth_db_service import AuthDBService
-                auth_db = AuthDBService()
+                auth_db = self._get_auth_db()
 
                 if auth_db.is_enabled:
                     logger.info("データベースへの認証情報保存を開始します",
@@ -433,12 +705,15 @@ class OptimizedAuthFlow:
                             user_id=hash_user_id(user_id))
 
             # 2. Redisまたはメモリに認証情報を保存（後方互換性）
+            store_in_memory = True
             if self.use_redis and self.redis_client:
                 try:
                     # Redisに保存（30日間有効）
                     key = f"auth:{user_id}"
                     ttl = Config.AUTH_SESSION_DAYS * 24 * 60 * 60  # 秒数
-                    self.redis_client.setex(key, ttl, json.dumps(auth_data))
+                    redis_auth_data = {**auth_data, 'auth_time': datetime.fromtimestamp(auth_time).isoformat()}
+                    self.redis_client.setex(key, ttl, orjson.dumps(redis_auth_data).decode("utf-8"))
+                    store_in_memory = False
                     logger.info("Redis に認証情報を保存しました",
                                user_id=hash_user_id(user_id),
                                store_code=store_code,
@@ -448,22 +723,27 @@ class OptimizedAuthFlow:
                     logger.warning("Redisへの保存に失敗しました。メモリに保存します。", error=str(e))
                     # Redis接続エラーの場合、今後はRedisを使用しない
                     self.use_redis = False
-                    self.authenticated_users[user_id] = auth_data
-            else:
-                # メモリに保存（フォールバック）
-                self.authenticated_users[user_id] = auth_data
+
+            with self._lock_for(user_id):
+                # 保存前の認証情報・判定結果を破棄
+                self._local_auth_info.pop(user_id, None)
+                self._unauth_decisions.pop(user_id, None)
+
+                if store_in_memory:
+                    # メモリに保存（フォールバック）
+                    self._store_auth_in_memory(user_id, auth_data)
+
+                # 認証状態を完了に設定（認証済みの有効期限を認証完了時点から数える）
+                session = self._get_session(user_id)
+                session.state = 'authenticated'
+                self._put_session(user_id, session)
+
+            if store_in_memory:
                 logger.info("メモリに認証情報を保存しました",
                            user_id=hash_user_id(user_id),
                            store_code=store_code,
                            staff_id=staff_id)
 
-            # 認証状態を完了に設定
-            self.auth_states[user_id] = 'authenticated'
-
-            # 一時データをクリア
-            if user_id in self.temp_data:
-                del self.temp_data[user_id]
-
             # スプレッドシートに認証情報を記録（非同期で実行）
             self.update_staff_auth_info_async(store_code, staff_id, user_id, auth_time)
 
@@ -471,15 +751,39 @@ class OptimizedAuthFlow:
             logger.error("認証完了処理に失敗しました", error=str(e))
             raise
 
-    def update_staff_auth_info_async(self, store_code: str, staff_id: str, user_id: str, auth_time: str):
-        """スタッフの認証情報をスプレッドシートに非同期で更新"""
+    def _store_auth_in_memory(self, user_id: str, auth_data: Dict[str, Any]):
+        """認証情報をメモリのセッションに保存"""
+        session = self._get_session(user_id)
+        # 店舗コード・店舗名は多数のユーザーで共通のため同一の文字列オブジェクトを共有
+        session.store_code = sys.intern(auth_data['store_code'])
+        session.staff_id = auth_data['staff_id']
+        session.store_name = sys.intern(auth_data['store_name'])
+        session.staff_name = auth_data['staff_name']
+        session.auth_time = auth_data['auth_time']
+
+    def _get_auth_info_from_memory(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """メモリのセッションから認証情報を取得"""
+        session = self._find_session(user_id)
+        if session is None or not session.has_auth_info:
+            return None
+        return session.to_auth_info()
+
+    def get_authenticated_users(self) -> Dict[str, Dict[str, Any]]:
+        """メモリに認証情報を保持しているユーザーの一覧を取得"""
+        return {
+            user_id: session.to_auth_info()
+            for user_id, session in self._snapshot_sessions()
+            if session.has_auth_info
+        }
+
+    def update_staff_auth_info_async(self, store_code: str, staff_id: str, user_id: str, auth_time: float):
+        """スタッフの認証情報をスプレッドシートに非同期で更新（auth_timeはUNIX時刻）"""
         try:
             # バックグラウンドでスプレッドシートを更新
-            import threading
-            
             def update_task():
                 try:
-                    self.staff_service.update_auth_info(store_code, staff_id, user_id, auth_time)
+                    auth_time_str = datetime.fromtimestamp(auth_time).isoformat()
+                    self.staff_service.update_auth_info(store_code, staff_id, user_id, auth_time_str)
                     logger.info("スプレッドシートに認証情報を記録しました", 
                                store_code=store_code, 
                                staff_id=staff_id, 
@@ -490,25 +794,34 @@ class OptimizedAuthFlow:
                                 store_code=store_code, 
                                 staff_id=staff_id)
             
-            # 非同期で実行
-            thread = threading.Thread(target=update_task)
-            thread.daemon = True
-            thread.start()
+            # 非同期で実行（同時書き込み数はワーカー数まで）
+            self._writer_pool.submit(update_task)
             
         except Exception as e:
             logger.error("非同期更新の開始に失敗しました", error=str(e))
 
     def is_authenticated(self, user_id: str) -> bool:
         """ユーザーが認証済みかチェック（ステータスも確認）"""
+        # 同じスタッフ情報で認証済みと確認したばかりであれば結果を再利用
+        if self._auth_decisions.get(user_id) == self._staff_cache_gen:
+            return True
+        # 認証情報が無いと確認したばかりであれば結果を再利用
+        if user_id in self._unauth_decisions:
+            return False
+
         try:
+            # 0. 直近に取得した認証情報があれば再利用
+            auth_info = self._local_auth_info.get(user_id)
+            source = "local" if auth_info else None
+            # データベース・Redisへの問い合わせに失敗した場合は「認証情報なし」と確定しない
+            lookup_failed = False
+
             # 1. データベースから認証情報を取得（最優先）
-            auth_info = None
             try:
-                from .auth_db_service import AuthDBService
-                auth_db = AuthDBService()
+                auth_db = self._get_auth_db()
 
-                if auth_db.is_enabled:
-                    db_auth = auth_db.get_auth(user_id)
+                if not auth_info and auth_db.is_enabled:
+                    db_auth = auth_db.get_auth(user_id, raise_errors=True)
                     if db_auth:
                         auth_info = {
                             'store_code': db_auth['store_code'],
@@ -517,9 +830,9 @@ class OptimizedAuthFlow:
                             'staff_name': db_auth.get('staff_name', ''),
                             'auth_time': db_auth.get('auth_time', '').isoformat() if db_auth.get('auth_time') else ''
                         }
-                        logger.debug("データベースから認証情報を取得しました",
-                                    user_id=hash_user_id(user_id))
+                        source = "database"
             except Exception as db_error:
+                lookup_failed = True
                 logger.error("データベースからの取得中にエラーが発生しました",
                             error=str(db_error),
                             user_id=hash_user_id(user_id))
@@ -532,44 +845,42 @@ class OptimizedAuthFlow:
                         key = f"auth:{user_id}"
                         auth_data_json = self.redis_client.get(key)
                         if auth_data_json:
-                            auth_info = json.loads(auth_data_json)
-                            logger.debug("Redisから認証情報を取得しました",
-                                       user_id=hash_user_id(user_id))
+                            auth_info = orjson.loads(auth_data_json)
+                            source = "redis"
                         else:
-                            logger.debug("ユーザーがRedisに存在しません",
-                                       user_id=hash_user_id(user_id))
                             # Redisに無い場合はメモリもチェック
-                            auth_info = self.authenticated_users.get(user_id)
-                            if not auth_info:
-                                return False
+                            auth_info = self._get_auth_info_from_memory(user_id)
+                            source = "memory"
                     except Exception as e:
                         logger.warning("Redisからの取得に失敗しました。メモリにフォールバックします。", error=str(e))
                         # Redis接続エラーの場合、今後はRedisを使用しない
                         self.use_redis = False
-                        auth_info = self.authenticated_users.get(user_id)
+                        lookup_failed = True
+                        auth_info = self._get_auth_info_from_memory(user_id)
+                        source = "memory"
                 else:
                     # メモリから取得
-                    auth_info = self.authenticated_users.get(user_id)
-                    if not auth_info:
-                        logger.debug("ユーザーが認証済みユーザーリストに存在しません",
-                                   user_id=hash_user_id(user_id))
-                        return False
+                    auth_info = self._get_auth_info_from_memory(user_id)
+                    source = "memory"
 
             if not auth_info:
+                logger.debug("認証情報が見つかりません", user_id=hash_user_id(user_id))
+                # 存在しないことを確認できた場合のみ結果を再利用する（一時的な障害でロックアウトしない）
+                if not lookup_failed:
+                    self._unauth_decisions.set(user_id, True)
                 return False
 
+            if source in ("database", "redis"):
+                self._local_auth_info.set(user_id, auth_info)
+
             # 認証済みユーザーのステータスをチェック
             store_code = auth_info.get('store_code')
             staff_id = auth_info.get('staff_id')
-
-            logger.debug("認証済みユーザーのステータスをチェック中",
-                        user_id=hash_user_id(user_id),
-                        store_code=store_code,
-                        staff_id=staff_id)
+            staff_status = None
 
             if store_code and staff_id:
-                # キャッシュを更新（必要に応じて）
-                self._update_cache_if_needed()
+                # キャッシュが古ければバックグラウンドで更新（ステータスは直前の読み込み結果で確認）
+                self._update_cache_in_background()
 
                 # スタッフのステータスをチェック
                 staff = self.staff_service.get_staff(store_code, staff_id)
@@ -593,12 +904,6 @@ class OptimizedAuthFlow:
                     return False
 
                 staff_status = staff.get('status')
-                logger.info("スタッフのステータスを確認", 
-                           user_id=hash_user_id(user_id), 
-                           store_code=store_code, 
-                           staff_id=staff_id, 
-                           status=staff_status)
-                
                 if staff_status != 'active':
                     # ステータスが無効な場合は認証を取り消し
                     logger.info("スタッフのステータスが無効になったため認証を取り消します", 
@@ -609,9 +914,12 @@ class OptimizedAuthFlow:
                     self.deauthenticate_user(user_id)
                     return False
             
-            logger.debug("認証チェック完了", 
-                        user_id=hash_user_id(user_id), 
+            logger.debug("認証チェック完了",
+                        user_id=hash_user_id(user_id),
+                        source=source,
+                        status=staff_status,
                         result=True)
+            self._auth_decisions.set(user_id, self._staff_cache_gen)
             return True
             
         except Exception as e:
@@ -628,36 +936,47 @@ class OptimizedAuthFlow:
     def get_auth_info(self, user_id: str) -> Optional[Dict]:
         """認証情報を取得（Redisまたはメモリから）"""
         try:
+            # 直近に取得した認証情報があれば再利用
+            auth_info = self._local_auth_info.get(user_id)
+            if auth_info:
+                return auth_info
+
             # Redisを使用している場合はRedisから取得
             if self.use_redis and self.redis_client:
                 try:
                     key = f"auth:{user_id}"
                     auth_data_json = self.redis_client.get(key)
                     if auth_data_json:
-                        return json.loads(auth_data_json)
+                        auth_info = orjson.loads(auth_data_json)
+                        self._local_auth_info.set(user_id, auth_info)
+                        return auth_info
                 except Exception as e:
                     logger.warning("Redisからの認証情報取得に失敗しました。メモリを確認します。", error=str(e))
                     # Redis接続エラーの場合、今後はRedisを使用しない
                     self.use_redis = False
 
             # メモリから取得
-            return self.authenticated_users.get(user_id)
+            return self._get_auth_info_from_memory(user_id)
         except Exception as e:
             logger.error("認証情報の取得に失敗しました", error=str(e))
             return None
 
     def send_auth_required_message(self, reply_token: str):
         """認証が必要な旨を伝えるメッセージを送信"""
-        message = "このBotをご利用いただくには認証が必要です。\n\n" \
-                "「認証」と入力してください。"
         try:
-            self.line_client.reply_text(reply_token, message)
+            self.line_client.reply_text(reply_token, _MSG_AUTH_REQUIRED)
             logger.info("認証が必要メッセージを送信しました")
         except Exception as e:
             logger.error("認証が必要メッセージの送信に失敗しました", error=str(e))
 
     def deauthenticate_user(self, user_id: str) -> bool:
-        """ユーザーの認証を取り消す"""
+        """
+        ユーザーの認証を取り消す
+
+        Redisからの削除はロックの外で行い、メモリのセッションの確認とリセットのみをユーザーのロック内で行う
+        """
+        self._auth_decisions.pop(user_id, None)
+        self._local_auth_info.pop(user_id, None)
         try:
             # Redisまたはメモリから認証情報を取得
             auth_info = None
@@ -666,11 +985,10 @@ class OptimizedAuthFlow:
             if self.use_redis and self.redis_client:
                 # Redisから取得して削除
                 try:
-                    key = f"auth:{user_id}"
-                    auth_data_json = self.redis_client.get(key)
+                    # 取得と削除を1回のコマンドで行う
+                    auth_data_json = self.redis_client.getdel(f"auth:{user_id}")
                     if auth_data_json:
-                        auth_info = json.loads(auth_data_json)
-                        self.redis_client.delete(key)
+                        auth_info = orjson.loads(auth_data_json)
                         found = True
                         logger.info("Redisから認証情報を削除しました",
                                    user_id=hash_user_id(user_id))
@@ -679,12 +997,19 @@ class OptimizedAuthFlow:
                     # Redis接続エラーの場合、今後はRedisを使用しない
                     self.use_redis = False
 
-            # メモリからも削除（フォールバック）
-            if user_id in self.authenticated_users:
-                if not auth_info:
-                    auth_info = self.authenticated_users[user_id]
-                del self.authenticated_users[user_id]
-                found = True
+            with self._lock_for(user_id):
+                # メモリからも削除（フォールバック）
+                memory_auth_info = self._get_auth_info_from_memory(user_id)
+                if memory_auth_info:
+                    if not auth_info:
+                        auth_info = memory_auth_info
+                    found = True
+
+                if found and auth_info:
+                    # 認証状態・認証情報をリセット
+                    self._put_session(user_id, UserAuthSession())
+
+            if memory_auth_info:
                 logger.info("メモリから認証情報を削除しました",
                            user_id=hash_user_id(user_id))
 
@@ -692,9 +1017,6 @@ class OptimizedAuthFlow:
                 store_code = auth_info.get('store_code')
                 staff_id = auth_info.get('staff_id')
 
-                # 認証状態をリセット
-                self.auth_states[user_id] = 'not_started'
-
                 logger.info("ユーザーの認証を取り消しました",
                            user_id=hash_user_id(user_id),
                            store_code=store_code,
@@ -711,11 +1033,6 @@ class OptimizedAuthFlow:
                         error=str(e))
             return False
 
-    def force_cache_update(self):
-        """キャッシュを強制更新"""
-        self.cache_valid = False
-        self._update_cache_if_needed()
-    
     def check_all_users_status(self):
         """全認証済みユーザーのステータスを即座にチェック"""
         try:
@@ -724,22 +1041,20 @@ class OptimizedAuthFlow:
             # キャッシュを強制更新
             self.force_cache_update()
             
-            # 認証済みユーザーのリストをコピー（変更中にエラーが発生しないように）
-            users_to_check = list(self.authenticated_users.keys())
+            # 認証済みユーザーの認証情報をコピー（変更中にエラーが発生しないように）
+            users_to_check = self.get_authenticated_users()
+            # 更新直後のスタッフ一覧を一度だけ取得し、各ユーザーを突き合わせる
+            all_staff = self.staff_service.get_all_staff()
             deauthenticated_users = []
             
-            for user_id in users_to_check:
+            for user_id, auth_info in users_to_check.items():
                 try:
-                    auth_info = self.authenticated_users.get(user_id)
-                    if not auth_info:
-                        continue
-                    
                     store_code = auth_info.get('store_code')
                     staff_id = auth_info.get('staff_id')
                     
                     if store_code and staff_id:
                         # スタッフのステータスをチェック
-                        staff = self.staff_service.get_staff(store_code, staff_id)
+                        staff = all_staff.get(f"{store_code}_{staff_id}")
                         if not staff or staff.get('status') != 'active':
                             # ステータスが無効な場合は認証を取り消し
                             logger.info("バッチチェックで無効なステータスを検出", 
@@ -758,8 +1073,7 @@ class OptimizedAuthFlow:
             
             logger.info("全認証済みユーザーのステータスチェックが完了しました", 
                        total_checked=len(users_to_check),
-                       deauthenticated_count=len(deauthenticated_users),
-                       deauthenticated_users=[hash_user_id(uid) for uid in deauthenticated_users])
+                       deauthenticated_count=len(deauthenticated_users))
             
             return {
                 'total_checked': len(users_to_check),
@@ -773,10 +1087,20 @@ class OptimizedAuthFlow:
 
     def get_stats(self) -> Dict[str, Any]:
         """認証統計を取得"""
+        # セッションを1回走査して件数と状態の一覧をまとめて集計
+        auth_states = {}
+        total_authenticated = 0
+        pending_auth = 0
+        for user_id, session in self._snapshot_sessions():
+            auth_states[user_id] = session.state
+            if session.has_auth_info:
+                total_authenticated += 1
+            if session.state != 'authenticated':
+                pending_auth += 1
         return {
-            'total_authenticated': len(self.authenticated_users),
-            'pending_auth': len([s for s in self.auth_states.values() if s != 'authenticated']),
-            'auth_states': dict(self.auth_states),
+            'total_authenticated': total_authenticated,
+            'pending_auth': pending_auth,
+            'auth_states': auth_states,
             'cache_valid': self._is_cache_valid(),
             'last_cache_update': self.last_cache_update,
             'last_updated': datetime.now().isoformat()
@@ -2,25 +2,52 @@
 Q&A検索サービス
 """
 
+import heapq
 import time
-import base64
-import binascii
-import json
-from typing import List, Optional, Dict, Any
+from bisect import bisect_right
+from collections import Counter
+from operator import attrgetter
+from typing import List, NamedTuple, Optional, Dict, Any, Set
 from datetime import datetime
 from cachetools import TTLCache
 import structlog
 
 import gspread
-from google.oauth2.service_account import Credentials
 from rapidfuzz import fuzz, process
 
 from .models import QAItem, SearchResult, SearchResponse, SystemStats
 from .config import Config
 from .utils import normalize_text, extract_keywords, split_comma_separated
+from .sheets_client import get_gspread_client
+
+# 条件付きインポート（rapidfuzzの一括スコア計算はnumpyの配列を返す）
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
 
 logger = structlog.get_logger(__name__)
 
+# 検索対象テキストを連結する区切り文字（正規化後のテキストには含まれない）
+_TEXT_SEPARATOR = "\n"
+
+
+class _SearchIndex(NamedTuple):
+    """検索用インデックス（読み込みのたびにまとめて差し替える）"""
+
+    qa_items: List[QAItem]
+    # 全アイテムの正規化済み検索対象テキスト
+    normalized_texts: List[str]
+    # i番目のアイテムのテキストは offsets[i]:offsets[i + 1] の範囲
+    offsets: List[int]
+    # 全テキストを区切り文字で連結した文字列と、各テキストの開始位置（部分一致の一括検索用）
+    joined_text: str
+    text_starts: List[int]
+    # 正規化済みテキスト -> そのテキストを持つアイテムの番号（完全一致の判定用）
+    exact_index: Dict[str, List[int]]
+
 
 class QAService:
     """Q&A検索サービス"""
@@ -30,6 +57,8 @@ class QAService:
         self.sheet_id = Config.SHEET_ID_QA
         self.cache = TTLCache(maxsize=1000, ttl=Config.CACHE_TTL_SECONDS)
         self.qa_items: List[QAItem] = []
+        # 検索用インデックス
+        self._search_index = self._build_search_index([])
         self.last_updated = datetime.now()
         self.stats = {
             "total_requests": 0,
@@ -41,6 +70,10 @@ class QAService:
         # AIサービスの初期化
         self.ai_service = ai_service
 
+        # スプレッドシート・ワークシートのハンドル（メタデータ取得のRPCを毎回行わないよう再利用）
+        self._spreadsheet = None
+        self._worksheets: Dict[str, Any] = {}
+
         # Google Sheets APIの初期化
         self._init_google_sheets()
 
@@ -48,44 +81,36 @@ class QAService:
         self.reload_cache()
 
     def _init_google_sheets(self):
-        """Google Sheets APIの初期化"""
+        """Google Sheets APIの初期化（プロセス内で共有のクライアントを使用）"""
         try:
-            # サービスアカウントJSONの処理
-            service_account_json = Config.GOOGLE_SERVICE_ACCOUNT_JSON
-
-            # Base64エンコードされているかチェック
-            try:
-                # Base64デコードを試行
-                decoded = base64.b64decode(service_account_json)
-                service_account_info = json.loads(decoded)
-            except (binascii.Error, ValueError):
-                # Base64デコードに失敗した場合は、生のJSON文字列として処理
-                service_account_info = json.loads(service_account_json)
-
-            # 認証情報の作成
-            credentials = Credentials.from_service_account_info(
-                service_account_info,
-                scopes=[
-                    "https://www.googleapis.com/auth/spreadsheets.readonly",
-                    "https://www.googleapis.com/auth/spreadsheets"
-                ],
-            )
-
-            # クライアントの作成
-            self.gc = gspread.authorize(credentials)
+            self.gc = get_gspread_client()
             logger.info("Google Sheets APIの初期化が完了しました")
 
         except Exception as e:
             logger.error("Google Sheets APIの初期化に失敗しました", error=str(e))
             raise
 
+    def _get_worksheet(self, worksheet_name: str):
+        """ワークシートを取得（一度開いたハンドルを再利用）"""
+        worksheet = self._worksheets.get(worksheet_name)
+        if worksheet is None:
+            if self._spreadsheet is None:
+                self._spreadsheet = self.gc.open_by_key(self.sheet_id)
+            worksheet = self._worksheets[worksheet_name] = self._spreadsheet.worksheet(worksheet_name)
+        return worksheet
+
+    def _reset_sheet_handles(self):
+        """スプレッドシート・ワークシートのハンドルを破棄（次回の取得時に開き直す）"""
+        self._spreadsheet = None
+        self._worksheets = {}
+
     def _get_sheet_with_retry(self, worksheet_name: str, max_retries: int = 3):
         """リトライ機能付きでシートを取得"""
         import random
 
         for attempt in range(max_retries):
             try:
-                sheet = self.gc.open_by_key(self.sheet_id).worksheet(worksheet_name)
+                sheet = self._get_worksheet(worksheet_name)
                 return sheet
             except Exception as e:
                 error_message = str(e)
@@ -108,13 +133,32 @@ class QAService:
                     # 503以外のエラーは即座に再スロー
                     raise
 
+    @staticmethod
+    def _values_to_records(values: List[List[Any]]) -> List[Dict[str, Any]]:
+        """
+        1行目をヘッダーとして、シートの値を行ごとの辞書に変換
+
+        get_all_records()と同様に、ヘッダーが重複している場合は列が上書きされないよう例外を送出する
+        """
+        if not values:
+            return []
+        header = values[0]
+        counts = Counter(header)
+        duplicates = [column for column in counts if counts[column] > 1]
+        if duplicates:
+            raise gspread.exceptions.GSpreadException(
+                f"the header row in the worksheet contains duplicates: {duplicates}"
+            )
+        return [dict(zip(header, row)) for row in values[1:]]
+
     def _get_records_with_retry(self, sheet, max_retries: int = 3):
         """リトライ機能付きでレコードを取得"""
         import random
 
         for attempt in range(max_retries):
             try:
-                return sheet.get_all_records()
+                # シート全体の値を1回のリクエストで取得し、辞書への変換はローカルで行う
+                return self._values_to_records(sheet.get_all_values())
             except Exception as e:
                 error_message = str(e)
                 # 503エラーまたはAPI制限エラーの場合
@@ -200,6 +244,7 @@ class QAService:
                     continue
 
             # 新しいデータが正常に取得できた場合のみ更新
+            self._search_index = self._build_search_index(new_qa_items)
             self.qa_items = new_qa_items
             self.last_updated = datetime.now()
             self.cache.clear()
@@ -212,6 +257,9 @@ class QAService:
             )
 
         except Exception as e:
+            # 再利用しているハンドルが無効になっている可能性があるため、次回は開き直す
+            self._reset_sheet_handles()
+
             # エラー時は既存のキャッシュを保持
             logger.error(
                 "キャッシュの再読み込みに失敗しました。既存のキャッシュを保持します。",
@@ -220,6 +268,7 @@ class QAService:
             )
             # バックアップから復元
             if backup_qa_items:
+                self._search_index = self._build_search_index(backup_qa_items)
                 self.qa_items = backup_qa_items
                 logger.warning(
                     f"既存のキャッシュ（{len(backup_qa_items)}件）を使用して継続動作します"
@@ -244,7 +293,8 @@ class QAService:
 
         try:
             # キャッシュチェック
-            cache_key = f"search:{normalize_text(query)}"
+            normalized_query = normalize_text(query)
+            cache_key = f"search:{normalized_query}"
             if cache_key in self.cache:
                 self.stats["cache_hits"] += 1
                 cached_result = self.cache[cache_key]
@@ -265,7 +315,7 @@ class QAService:
                 else:
                     # AIで見つからない場合はキーワードマッチングにフォールバック
                     logger.info("AI判断で該当なし。キーワードマッチングにフォールバックします", query=query)
-                    search_results = self._search_qa_items(query)
+                    search_results = self._search_qa_items(query, normalized_query)
                     if search_results:
                         logger.info("キーワードマッチングで候補を発見しました",
                                    query=query,
@@ -273,7 +323,7 @@ class QAService:
             else:
                 # AIが無効な場合はキーワードマッチングを使用
                 logger.info("AIが無効のため、キーワードマッチングを使用", query=query)
-                search_results = self._search_qa_items(query)
+                search_results = self._search_qa_items(query, normalized_query)
 
             # 結果の構築
             is_found = False
@@ -281,8 +331,10 @@ class QAService:
             candidates = []
 
             if search_results:
-                # スコアでソート
-                search_results.sort(key=lambda x: x.score, reverse=True)
+                # スコア上位の候補のみ取得（全件をソートしない）
+                search_results = heapq.nlargest(
+                    Config.MAX_CANDIDATES, search_results, key=attrgetter("score")
+                )
 
                 # 閾値チェック
                 if search_results[0].score >= Config.MATCH_THRESHOLD:
@@ -429,47 +481,172 @@ class QAService:
             logger.error("Q&A内容の取得に失敗しました", error=str(e))
             return "Q&A内容の取得に失敗しました"
 
-    def _search_qa_items(self, query: str) -> List[SearchResult]:
+    @staticmethod
+    def _build_search_index(qa_items: List[QAItem]) -> _SearchIndex:
+        """
+        検索用インデックスを構築（読み込み時に一度だけ実行）
+
+        全アイテムの正規化済み検索対象テキストを1つのリストにまとめ、
+        検索時に類似度やキーワードの出現を一括で調べられるようにする
+        """
+        normalized_texts = []
+        offsets = [0]
+        exact_index: Dict[str, List[int]] = {}
+        for item_index, qa_item in enumerate(qa_items):
+            normalized_texts.extend(qa_item.normalized_texts)
+            offsets.append(len(normalized_texts))
+            for normalized_text in dict.fromkeys(qa_item.normalized_texts):
+                exact_index.setdefault(normalized_text, []).append(item_index)
+
+        text_starts = []
+        position = 0
+        for text in normalized_texts:
+            text_starts.append(position)
+            position += len(text) + len(_TEXT_SEPARATOR)
+
+        return _SearchIndex(
+            qa_items=qa_items,
+            normalized_texts=normalized_texts,
+            offsets=offsets,
+            joined_text=_TEXT_SEPARATOR.join(normalized_texts),
+            text_starts=text_starts,
+            exact_index=exact_index,
+        )
+
+    @staticmethod
+    def _texts_containing(index: _SearchIndex, keywords: List[str]) -> Set[int]:
+        """
+        いずれかのキーワードを含むテキストの番号を取得
+
+        テキストごとに部分一致を調べる代わりに、連結済みの文字列を
+        キーワードごとに一度ずつ走査する
+        """
+        if any(not keyword for keyword in keywords):
+            # 空のキーワードはすべてのテキストに含まれる
+            return set(range(len(index.normalized_texts)))
+
+        joined_text = index.joined_text
+        text_starts = index.text_starts
+        hits = set()
+        for keyword in keywords:
+            position = joined_text.find(keyword)
+            while position != -1:
+                text_index = bisect_right(text_starts, position) - 1
+                hits.add(text_index)
+                # 同じテキスト内の以降の出現は調べず、次のテキストから探す
+                if text_index + 1 >= len(text_starts):
+                    break
+                position = joined_text.find(keyword, text_starts[text_index + 1])
+        return hits
+
+    @staticmethod
+    def _fuzzy_scores(query: str, normalized_texts: List[str]) -> List[float]:
+        """
+        クエリと各テキストのFuzzyスコアを一括で計算
+
+        Returns:
+            partial_ratioとtoken_sort_ratioの平均（0.0〜1.0）のリスト
+        """
+        if not normalized_texts:
+            return []
+
+        if NUMPY_AVAILABLE:
+            # 全テキストとの類似度をrapidfuzzの内部で一括計算する
+            ratio = process.cdist([query], normalized_texts, scorer=fuzz.partial_ratio, dtype=np.float64)[0]
+            token_sort_ratio = process.cdist(
+                [query], normalized_texts, scorer=fuzz.token_sort_ratio, dtype=np.float64
+            )[0]
+            return ((ratio / 100.0 + token_sort_ratio / 100.0) / 2.0).tolist()
+
+        return [
+            (fuzz.partial_ratio(query, text) / 100.0 + fuzz.token_sort_ratio(query, text) / 100.0) / 2.0
+            for text in normalized_texts
+        ]
+
+    def _search_qa_items(self, query: str, normalized_query: Optional[str] = None) -> List[SearchResult]:
         """
         Q&Aアイテムの検索
 
         Args:
             query: 検索クエリ
+            normalized_query: 正規化済みのクエリ（省略時はqueryを正規化）
 
         Returns:
             検索結果のリスト
         """
-        if not query or not self.qa_items:
+        index = self._search_index
+        qa_items, normalized_texts, offsets = index.qa_items, index.normalized_texts, index.offsets
+        if not query or not qa_items:
             return []
 
-        normalized_query = normalize_text(query)
+        if normalized_query is None:
+            normalized_query = normalize_text(query)
+
+        # 検索対象テキストと完全一致する場合は、類似度を計算せずにそのアイテムを返す
+        exact_item_indexes = index.exact_index.get(normalized_query)
+        if exact_item_indexes:
+            return [
+                self._build_search_result(
+                    qa_items[item_index], normalized_query, min(qa_items[item_index].priority_weight, 1.0)
+                )
+                for item_index in exact_item_indexes
+            ]
+
         query_keywords = extract_keywords(normalized_query)
+        fuzzy_scores = self._fuzzy_scores(normalized_query, normalized_texts)
+
+        # キーワードを含むテキストを一括で調べておく
+        keyword_flags = bytearray(len(normalized_texts))
+        for text_index in self._texts_containing(index, query_keywords):
+            keyword_flags[text_index] = 1
 
         results = []
 
-        for qa_item in self.qa_items:
-            score = self._calculate_score(qa_item, normalized_query, query_keywords)
+        for i, qa_item in enumerate(qa_items):
+            start, end = offsets[i], offsets[i + 1]
+            score = self._calculate_score(
+                qa_item,
+                normalized_query,
+                normalized_texts[start:end],
+                fuzzy_scores[start:end],
+                keyword_flags[start:end],
+            )
 
             if score > 0:
-                # マッチタイプの判定
-                match_type = self._determine_match_type(
-                    qa_item, normalized_query, score
-                )
-                matched_text = self._get_matched_text(qa_item, normalized_query)
+                results.append(self._build_search_result(qa_item, normalized_query, score))
 
-                result = SearchResult(
-                    qa_item=qa_item,
-                    score=score,
-                    match_type=match_type,
-                    matched_text=matched_text,
-                )
+        return results
 
-                results.append(result)
+    def _build_search_result(self, qa_item: QAItem, query: str, score: float) -> SearchResult:
+        """
+        検索結果を作成
 
-        return results
+        Args:
+            qa_item: Q&Aアイテム
+            query: 正規化されたクエリ
+            score: スコア
+
+        Returns:
+            検索結果
+        """
+        # マッチタイプの判定
+        match_type = self._determine_match_type(qa_item, query, score)
+        matched_text = self._get_matched_text(qa_item, query)
+
+        return SearchResult(
+            qa_item=qa_item,
+            score=score,
+            match_type=match_type,
+            matched_text=matched_text,
+        )
 
     def _calculate_score(
-        self, qa_item: QAItem, query: str, query_keywords: List[str]
+        self,
+        qa_item: QAItem,
+        query: str,
+        normalized_texts: List[str],
+        fuzzy_scores: List[float],
+        keyword_flags: bytes,
     ) -> float:
         """
         スコアの計算
@@ -477,22 +654,16 @@ class QAService:
         Args:
             qa_item: Q&Aアイテム
             query: 正規化されたクエリ
-            query_keywords: クエリのキーワード
+            normalized_texts: アイテムの正規化済み検索対象テキスト
+            fuzzy_scores: 各テキストのFuzzyスコア（_fuzzy_scoresで計算済み）
+            keyword_flags: 各テキストがクエリのキーワードを含むかどうか
 
         Returns:
             スコア（0.0〜1.0）
         """
         max_score = 0.0
 
-        # 検索対象テキストの取得
-        searchable_texts = qa_item.get_all_searchable_texts()
-
-        for text in searchable_texts:
-            if not text:
-                continue
-
-            normalized_text = normalize_text(text)
-
+        for normalized_text, fuzzy_score, has_keyword in zip(normalized_texts, fuzzy_scores, keyword_flags):
             # 1. 厳密一致
             if query == normalized_text:
                 score = 1.0
@@ -500,19 +671,19 @@ class QAService:
             elif query in normalized_text or normalized_text in query:
                 score = 0.6
             # 3. キーワード部分一致
-            elif any(keyword in normalized_text for keyword in query_keywords):
+            elif has_keyword:
                 score = 0.4
             # 4. Fuzzy一致
             else:
-                # rapidfuzzを使用した類似度計算
-                ratio = fuzz.partial_ratio(query, normalized_text) / 100.0
-                token_sort_ratio = fuzz.token_sort_ratio(query, normalized_text) / 100.0
-                score = (ratio + token_sort_ratio) / 2.0
+                score = fuzzy_score
 
             # 優先度の重み付け
             if score > 0:
-                score *= 1 + qa_item.priority * 0.05
+                score *= qa_item.priority_weight
                 max_score = max(max_score, score)
+                # 上限に達した場合は残りのテキストを評価しない
+                if max_score >= 1.0:
+                    return 1.0
 
         return min(max_score, 1.0)
 
@@ -548,10 +719,8 @@ class QAService:
         Returns:
             マッチしたテキスト
         """
-        searchable_texts = qa_item.get_all_searchable_texts()
-
-        for text in searchable_texts:
-            normalized_text = normalize_text(text)
+        # 正規化済みテキストは読み込み時に作成済み
+        for text, normalized_text in zip(qa_item.get_all_searchable_texts(), qa_item.normalized_texts):
             if query in normalized_text or normalized_text in query:
                 return text
 
@@ -569,14 +738,15 @@ class QAService:
             if not self.qa_items:
                 return False
 
-            # スプレッドシートへの接続テスト（リトライ機能付き）
+            # スプレッドシートへの接続テスト（全件は取得せず1セルのみ読み取る）
             sheet = self._get_sheet_with_retry("qa_items")
-            self._get_records_with_retry(sheet)
+            sheet.acell("A1")
 
             return True
 
         except Exception as e:
             logger.error("ヘルスチェックに失敗しました", error=str(e))
+            self._reset_sheet_handles()
             return False
 
     def get_stats(self) -> SystemStats:
@@ -649,13 +819,15 @@ class QAService:
 
             # Google Sheetsに追記
             try:
-                sheet = self.gc.open_by_key(self.sheet_id).worksheet(Config.QUERY_LOG_SHEET)
+                sheet = self._get_worksheet(Config.QUERY_LOG_SHEET)
                 sheet.append_row(log_row)
                 logger.info("質問をログに記録しました", query=query, result_type=result_type)
             except gspread.WorksheetNotFound:
                 logger.warning(f"{Config.QUERY_LOG_SHEET}シートが見つかりません。ログ機能を無効にするか、シートを作成してください。")
             except Exception as e:
                 logger.error("質問ログの記録に失敗しました", error=str(e))
+                # 次回はワークシートを開き直す
+                self._worksheets.pop(Config.QUERY_LOG_SHEET, None)
 
         except Exception as e:
             logger.error("質問ログ処理中にエラーが発生しました", error=str(e))
@@ -744,12 +916,7 @@ class QAService:
         """qa_listシートのデータを読み込み"""
         try:
             # スプレッドシートを開く
-            credentials = Credentials.from_service_account_info(
-                json.loads(Config.GOOGLE_SERVICE_ACCOUNT_JSON),
-                scopes=['https://www.googleapis.com/auth/spreadsheets']
-            )
-            gc = gspread.authorize(credentials)
-            spreadsheet = gc.open_by_key(self.sheet_id)
+            spreadsheet = self.gc.open_by_key(self.sheet_id)
             
             # qa_listシートの存在確認
             try:
@@ -2,10 +2,10 @@
 セッション管理サービス（Redis）
 """
 
-import json
 import time
 from typing import Optional, Dict, Any
 import structlog
+import orjson
 import redis
 from .config import Config
 
@@ -31,7 +31,8 @@ class SessionService:
                 port=Config.REDIS_PORT,
                 password=Config.REDIS_PASSWORD,
                 db=Config.REDIS_DB,
-                decode_responses=True,
+                # セッションはJSONバイト列のまま読み書きする（文字列へのデコードを省略）
+                decode_responses=False,
                 socket_connect_timeout=5,
                 socket_timeout=5,
             )
@@ -63,10 +64,9 @@ class SessionService:
         """
         try:
             key = f"session:{user_id}"
-            value = json.dumps(session_data, ensure_ascii=False)
             
             if self.redis_client:
-                self.redis_client.setex(key, ttl, value)
+                self.redis_client.setex(key, ttl, orjson.dumps(session_data))
             else:
                 # メモリキャッシュ
                 expire_at = time.time() + ttl
@@ -95,7 +95,7 @@ class SessionService:
             if self.redis_client:
                 value = self.redis_client.get(key)
                 if value:
-                    return json.loads(value)
+                    return orjson.loads(value)
             else:
                 # メモリキャッシュ
                 if key in self._memory_cache:
@@ -112,6 +112,30 @@ class SessionService:
             logger.error("セッションの取得に失敗しました", user_id=user_id, error=str(e))
             return None
 
+    def has_session(self, user_id: str) -> bool:
+        """
+        セッションが存在するかを確認（データの取得・デシリアライズは行わない）
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            存在する場合はTrue
+        """
+        try:
+            key = f"session:{user_id}"
+
+            if self.redis_client:
+                return bool(self.redis_client.exists(key))
+
+            # メモリキャッシュ
+            entry = self._memory_cache.get(key)
+            return entry is not None and time.time() < entry[1]
+
+        except Exception as e:
+            logger.error("セッションの存在確認に失敗しました", user_id=user_id, error=str(e))
+            return False
+
     def delete_session(self, user_id: str) -> bool:
         """
         セッションを削除
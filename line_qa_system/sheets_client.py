@@ -0,0 +1,75 @@
+"""
+Google Sheets クライアント（プロセス内で共有）
+"""
+
+import base64
+import binascii
+import os
+from functools import lru_cache
+from typing import Any, Dict
+
+import structlog
+import gspread
+import orjson
+from google.oauth2.service_account import Credentials
+
+from .config import Config
+
+logger = structlog.get_logger(__name__)
+
+# 読み取りのみのクライアントのスコープ（FlowService）
+READONLY_SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+    # 変更検知（更新日時の取得）用
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+)
+# 書き込みを行うクライアントのスコープ（Q&Aのログ記録・店舗・スタッフ管理）
+READWRITE_SCOPES = (
+    "https://www.googleapis.com/auth/spreadsheets",
+)
+
+
+@lru_cache(maxsize=1)
+def load_service_account_info() -> Dict[str, Any]:
+    """
+    サービスアカウントJSONを読み込み（Base64エンコード・生のJSON・ファイルパスに対応）
+
+    Returns:
+        サービスアカウント情報
+    """
+    service_account_json = Config.GOOGLE_SERVICE_ACCOUNT_JSON
+
+    # ファイルパスが指定されている場合はファイルから読み込む
+    if not service_account_json.lstrip().startswith("{") and os.path.isfile(service_account_json):
+        with open(service_account_json, "rb") as f:
+            return orjson.loads(f.read())
+
+    # Base64エンコードされているかチェック
+    try:
+        # Base64デコードを試行
+        decoded = base64.b64decode(service_account_json)
+        return orjson.loads(decoded)
+    except (binascii.Error, ValueError):
+        # Base64デコードに失敗した場合は、生のJSON文字列として処理
+        return orjson.loads(service_account_json)
+
+
+@lru_cache(maxsize=2)
+def get_gspread_client(readonly: bool = False) -> gspread.Client:
+    """
+    共有のgspreadクライアントを取得（スコープごとに初回呼び出し時に認証）
+
+    Args:
+        readonly: Trueの場合は読み取り専用のスコープで認証したクライアントを返す
+
+    Returns:
+        gspreadクライアント
+    """
+    scopes = READONLY_SCOPES if readonly else READWRITE_SCOPES
+    credentials = Credentials.from_service_account_info(
+        load_service_account_info(),
+        scopes=list(scopes),
+    )
+    client = gspread.authorize(credentials)
+    logger.info("Google Sheetsクライアントを初期化しました", readonly=readonly)
+    return client
@@ -10,6 +10,7 @@ from datetime import datetime
 import structlog
 
 from .config import Config
+from .sheets_client import get_gspread_client
 from .utils import hash_user_id
 
 logger = structlog.get_logger(__name__)
@@ -33,43 +34,18 @@ class StaffService:
     def load_staff_data(self):
         """スプレッドシートからスタッフデータを読み込み"""
         try:
-            # 直接Google Sheets APIを使用してデータを取得
-            import gspread
-            from google.oauth2.service_account import Credentials
-            import json
-            
-            # 認証情報を取得
-            service_account_json = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON')
-            if not service_account_json:
+            # 認証情報を確認
+            if not os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON'):
                 logger.warning("GOOGLE_SERVICE_ACCOUNT_JSONが設定されていません")
                 return
-            
-            # 認証情報を作成
-            import base64
+
+            # 共有のgspreadクライアントを取得
             try:
-                if service_account_json.startswith('{'):
-                    # 直接JSON文字列の場合
-                    credentials_dict = json.loads(service_account_json)
-                elif service_account_json.startswith('ewogICJ0eXBlIjo'):
-                    # base64エンコードされた場合（Railway）
-                    decoded_json = base64.b64decode(service_account_json).decode('utf-8')
-                    credentials_dict = json.loads(decoded_json)
-                else:
-                    # ファイルパスの場合
-                    with open(service_account_json, 'r') as f:
-                        credentials_dict = json.load(f)
+                gc = get_gspread_client()
             except Exception as e:
                 logger.error("認証情報の解析に失敗しました", error=str(e))
                 return
             
-            credentials = Credentials.from_service_account_info(
-                credentials_dict,
-                scopes=['https://www.googleapis.com/auth/spreadsheets']
-            )
-            
-            # gspreadクライアントを初期化
-            gc = gspread.authorize(credentials)
-            
             # スプレッドシートを開く
             sheet_id = os.environ.get('SHEET_ID_QA')
             if not sheet_id:
@@ -116,6 +92,10 @@ class StaffService:
         key = f"{store_code}_{staff_id}"
         return self.staff_data.get(key)
     
+    def get_all_staff(self) -> Dict[str, Dict[str, Any]]:
+        """全スタッフ情報を取得（キー: "店舗コード_スタッフID"、返り値は変更しないこと）"""
+        return self.staff_data
+    
     def staff_exists(self, store_code: str, staff_id: str) -> bool:
         """スタッフが存在するかチェック"""
         key = f"{store_code}_{staff_id}"
@@ -526,43 +506,18 @@ class StaffService:
     def update_staff_in_sheet(self, store_code: str, staff_id: str, updates: Dict[str, Any]):
         """スプレッドシートのスタッフ情報を更新"""
         try:
-            # 直接Google Sheets APIを使用してデータを取得・更新
-            import gspread
-            from google.oauth2.service_account import Credentials
-            import json
-            import base64
-            
-            # 認証情報を取得
-            service_account_json = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON')
-            if not service_account_json:
+            # 認証情報を確認
+            if not os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON'):
                 logger.warning("GOOGLE_SERVICE_ACCOUNT_JSONが設定されていません")
                 return
-            
-            # 認証情報を作成
+
+            # 共有のgspreadクライアントを取得
             try:
-                if service_account_json.startswith('{'):
-                    # 直接JSON文字列の場合
-                    credentials_dict = json.loads(service_account_json)
-                elif service_account_json.startswith('ewogICJ0eXBlIjo'):
-                    # base64エンコードされた場合（Railway）
-                    decoded_json = base64.b64decode(service_account_json).decode('utf-8')
-                    credentials_dict = json.loads(decoded_json)
-                else:
-                    # ファイルパスの場合
-                    with open(service_account_json, 'r') as f:
-                        credentials_dict = json.load(f)
+                gc = get_gspread_client()
             except Exception as e:
                 logger.error("認証情報の解析に失敗しました", error=str(e))
                 return
             
-            credentials = Credentials.from_service_account_info(
-                credentials_dict,
-                scopes=['https://www.googleapis.com/auth/spreadsheets']
-            )
-            
-            # gspreadクライアントを初期化
-            gc = gspread.authorize(credentials)
-            
             # スプレッドシートを開く
             sheet_id = os.environ.get('SHEET_ID_QA')
             if not sheet_id:
@@ -8,6 +8,7 @@ import hmac
 import base64
 import unicodedata
 import re
+from functools import lru_cache
 from typing import List, Set, Dict, Any
 
 
@@ -58,19 +59,27 @@ def hash_user_id(user_id: str, salt: str = None) -> str:
             from .config import Config
             salt = Config.HASH_SALT
 
-        # ソルト付きでハッシュ化
-        hash_obj = hashlib.sha256()
-        hash_obj.update((user_id + salt).encode("utf-8"))
-        return hash_obj.hexdigest()[:16]  # 16文字に短縮
+        return _hash_with_salt(user_id, salt)
     except Exception:
         # エラー時は元のIDをそのまま返す（ログ記録のため）
         return user_id
 
 
+@lru_cache(maxsize=4096)
+def _hash_with_salt(user_id: str, salt: str) -> str:
+    """ソルト付きでハッシュ化（1件のメッセージ処理で何度もログに出力されるため結果を再利用）"""
+    hash_obj = hashlib.sha256()
+    hash_obj.update((user_id + salt).encode("utf-8"))
+    return hash_obj.hexdigest()[:16]  # 16文字に短縮
+
+
+@lru_cache(maxsize=65536)
 def normalize_text(text: str) -> str:
     """
     テキストの正規化（前処理）
 
+    同じクエリ・Q&Aテキストが繰り返し正規化されるため結果を再利用する
+
     Args:
         text: 元のテキスト
 
@@ -154,6 +163,14 @@ def fullwidth_to_halfwidth(text: str) -> str:
     return result
 
 
+@lru_cache(maxsize=1)
+def _get_sudachi_dictionary():
+    """SudachiPyの辞書を取得（読み込みに時間がかかるため一度だけ読み込む）"""
+    from sudachipy import dictionary
+
+    return dictionary.Dictionary()
+
+
 def extract_keywords(text: str, min_length: int = 2) -> List[str]:
     """
     テキストからキーワードを抽出（AIベースの形態素解析）
@@ -170,11 +187,8 @@ def extract_keywords(text: str, min_length: int = 2) -> List[str]:
     
     try:
         # SudachiPyを使用した形態素解析
-        from sudachipy import tokenizer
-        from sudachipy import dictionary
-        
-        # トークナイザーの初期化
-        tokenizer_obj = dictionary.Dictionary().create()
+        # トークナイザーの初期化（辞書は共有し、スレッド間で共有しないようトークナイザーは毎回作成）
+        tokenizer_obj = _get_sudachi_dictionary().create()
         
         # 形態素解析の実行
         tokens = tokenizer_obj.tokenize(text)
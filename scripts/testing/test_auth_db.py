@@ -192,7 +192,7 @@ def test_auth_db_service():
 
         auth_db = AuthDBService()
         print(f"is_enabled: {auth_db.is_enabled}")
-        print(f"has_connection: {auth_db.connection is not None}")
+        print(f"has_pool: {auth_db.pool is not None}")
 
         if not auth_db.is_enabled:
             print("❌ AuthDBServiceが無効化されています")
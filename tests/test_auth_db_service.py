@@ -0,0 +1,119 @@
+"""
+認証データベースサービスのテスト
+"""
+
+import threading
+
+import psycopg2
+import pytest
+from psycopg2 import pool
+
+from line_qa_system.auth_db_service import AuthDBError, AuthDBService
+
+
+class _FakeCursor:
+    """実行したクエリを接続に記録するカーソル"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        if self.connection.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.connection.queries.append(query)
+
+    def fetchone(self):
+        return {"store_code": "STORE001", "staff_id": "001"}
+
+
+class _FakeConnection:
+    """クエリの記録とcommit/rollbackのみを持つ接続"""
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.closed = 0
+        self.queries = []
+
+    def cursor(self, cursor_factory=None):
+        return _FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class _FakePool:
+    """用意した接続を順に貸し出す接続プール"""
+
+    closed = False
+
+    def __init__(self, connections):
+        self.connections = list(connections)
+        self.discarded = []
+
+    def getconn(self):
+        return self.connections.pop(0)
+
+    def putconn(self, conn, close=False):
+        if close:
+            self.discarded.append(conn)
+        else:
+            self.connections.append(conn)
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    def make(connections):
+        service = AuthDBService()
+        service.pool = _FakePool(connections)
+        service.is_enabled = True
+        return service
+
+    return make
+
+
+class TestConnectionHandling:
+    """接続プールの扱いのテスト"""
+
+    def test_dropped_connection_is_discarded_and_retried(self, make_service):
+        """切断された接続は破棄し、新しい接続で1回だけ再試行する"""
+        dropped, fresh = _FakeConnection(broken=True), _FakeConnection()
+        service = make_service([dropped, fresh])
+
+        assert service.health_check() is True
+        assert service.pool.discarded == [dropped]
+        assert fresh.queries == ["SELECT 1"]
+
+    def test_get_auth_reports_errors_when_requested(self, make_service):
+        """再試行しても失敗した場合は呼び出し元にエラーを伝える"""
+        service = make_service([_FakeConnection(broken=True), _FakeConnection(broken=True)])
+        with pytest.raises(AuthDBError):
+            service.get_auth("U1", raise_errors=True)
+
+    def test_waits_for_free_connection(self, make_service, monkeypatch):
+        """接続プールに空きが無い場合は待ち、時間内に空かなければPoolErrorを送出する"""
+        monkeypatch.setattr(AuthDBService, "POOL_WAIT_SECONDS", 0.05)
+        service = make_service([_FakeConnection()])
+        service._pool_slots = threading.BoundedSemaphore(1)
+
+        with service._connection():
+            with pytest.raises(pool.PoolError):
+                with service._connection():
+                    pass
+
+        # 返却後は再び借りられる
+        assert service.health_check() is True
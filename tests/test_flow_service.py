@@ -0,0 +1,194 @@
+"""
+フローサービスのテスト
+"""
+
+import pytest
+from line_qa_system.flow_service import FlowService
+
+
+FLOW_ROWS = [
+    ["id", "trigger", "step", "question", "options", "next_step", "end", "fallback_next"],
+    ["1", "見積", "1", "用途は？", "企業／個人", "2／2", "FALSE", "999"],
+    ["2", "見積", "2", "予算は？", "10万／20万", "999／999", "TRUE", "999"],
+    ["3", "Repair", "1", "修正内容は？", "テロップ／カット", "999／999", "TRUE", "999"],
+    ["4", "料金相談", "1", "どのプランですか？", "ベーシック／プレミアム", "999／999", "TRUE", "999"],
+    ["x", "壊れた行", "1", "", "", "", "", ""],
+]
+
+
+class _FakeSpreadsheet:
+    """values_getと更新日時の取得のみを持つスプレッドシート"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.modified_time = "2025-01-01T00:00:00Z"
+
+    def values_get(self, range_name, params=None):
+        return {"values": self.rows}
+
+    def get_lastUpdateTime(self):
+        return self.modified_time
+
+
+class _FakeClient:
+    """open_by_keyのみを持つgspreadクライアント"""
+
+    def __init__(self, rows):
+        self.spreadsheet = _FakeSpreadsheet(rows)
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+class _FakeSessionService:
+    """辞書でセッションを保持するセッションサービス"""
+
+    def __init__(self):
+        self.sessions = {}
+
+    def set_session(self, user_id, session_data, ttl=1800):
+        self.sessions[user_id] = session_data
+        return True
+
+    def get_session(self, user_id):
+        return self.sessions.get(user_id)
+
+    def has_session(self, user_id):
+        return user_id in self.sessions
+
+    def delete_session(self, user_id):
+        self.sessions.pop(user_id, None)
+        return True
+
+
+@pytest.fixture
+def flow_service():
+    service = FlowService(session_service=_FakeSessionService(), ai_service=object())
+    service._gc = _FakeClient(FLOW_ROWS)
+    return service
+
+
+class TestFlowLookup:
+    """フロー検索のテスト"""
+
+    def test_invalid_rows_are_skipped(self, flow_service):
+        """解析できない行はスキップされる"""
+        assert [flow.id for flow in flow_service.flows] == [1, 2, 3, 4]
+
+    def test_get_flow_by_trigger(self, flow_service):
+        """トリガーとステップで取得（大文字小文字を区別しない）"""
+        assert flow_service.get_flow_by_trigger("見積", 2).id == 2
+        assert flow_service.get_flow_by_trigger("repair").id == 3
+        assert flow_service.get_flow_by_trigger("見積", 3) is None
+
+    def test_get_flow_by_id(self, flow_service):
+        """IDで取得"""
+        assert flow_service.get_flow_by_id(3).trigger == "Repair"
+        assert flow_service.get_flow_by_id(99) is None
+
+    def test_get_available_triggers(self, flow_service):
+        """ステップ1のトリガーのみ返す"""
+        assert flow_service.get_available_triggers() == ["Repair", "料金相談", "見積"]
+
+    def test_find_flow_by_natural_language(self, flow_service):
+        """キーワードからフローを検索"""
+        assert flow_service.find_flow_by_natural_language("費用はいくらですか").id == 4
+        # フローが存在しないトリガーのキーワードは無視される
+        assert flow_service.find_flow_by_natural_language("動画の料金は？").id == 4
+        assert flow_service.find_flow_by_natural_language("こんにちは") is None
+
+
+class TestProcessUserChoice:
+    """選択処理のテスト"""
+
+    def test_choice_matches_option(self, flow_service):
+        """選択肢を含む入力で次のステップへ進む"""
+        flow_service.start_flow("user", "見積")
+        next_flow, is_end = flow_service.process_user_choice("user", "個人で使います")
+        assert next_flow.id == 2
+        assert is_end is True
+        assert flow_service.session_service.get_session("user") is None
+        assert flow_service.is_in_flow("user") is False
+
+
+class _FakeModel:
+    """固定の回答を返す生成モデル"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return self
+
+
+class _FakeAIService:
+    """生成モデルのみを持つAIサービス"""
+
+    is_enabled = True
+
+    def __init__(self, text):
+        self.model = _FakeModel(text)
+
+
+class TestFlowByAIContext:
+    """AI文脈判断のテスト"""
+
+    def _service(self, ai_text):
+        service = FlowService(session_service=None, ai_service=_FakeAIService(ai_text))
+        service._gc = _FakeClient(FLOW_ROWS)
+        return service
+
+    def test_result_is_cached(self):
+        """同じ入力ではAIを再度呼び出さない"""
+        service = self._service("料金相談")
+        assert service.find_flow_by_ai_context("料金について").id == 4
+        assert service.find_flow_by_ai_context(" 料金について ").id == 4
+        assert service.ai_service.model.calls == 1
+
+    def test_none_result_is_cached(self):
+        """フローに該当しない判断もキャッシュされる"""
+        service = self._service("NONE")
+        assert service.find_flow_by_ai_context("営業時間は？") is None
+        assert service.find_flow_by_ai_context("営業時間は？") is None
+        assert service.ai_service.model.calls == 1
+
+    def test_fuzzy_trigger_mapping(self):
+        """AIの回答がトリガー名と完全一致しなくても近いトリガーにマップする"""
+        service = self._service("料金相談 のフロー")
+        assert service.find_flow_by_ai_context("いくらかかる？").id == 4
+
+    def test_prefix_trigger_mapping(self):
+        """トリガー名に説明が続く回答は前方一致でマップする"""
+        service = self._service("ＲＥＰＡＩＲについて")
+        assert service.find_flow_by_ai_context("直してほしい").id == 3
+
+    def test_ngram_trigger_mapping(self):
+        """類似度スコアが低い場合も文字n-gramで近いトリガーにマップする"""
+        service = self._service("ご料金相談です。")
+        assert service.find_flow_by_ai_context("費用を知りたい").id == 4
+
+    def test_unrelated_answer_is_not_mapped(self):
+        """どのトリガーにも似ていない回答はマップしない"""
+        service = self._service("採用情報")
+        assert service.find_flow_by_ai_context("求人はありますか") is None
+
+
+class TestReloadFlows:
+    """フローデータ再読み込みのテスト"""
+
+    def test_unchanged_sheet_is_not_refetched(self, flow_service):
+        """更新日時が変わっていない場合は再取得しない"""
+        spreadsheet = flow_service.gc.spreadsheet
+        flow_service.reload_flows()
+        version = flow_service._flows_version
+
+        spreadsheet.rows = FLOW_ROWS[:2]
+        flow_service.reload_flows()
+        assert flow_service._flows_version == version
+        assert len(flow_service.flows) == 4
+
+        spreadsheet.modified_time = "2025-01-02T00:00:00Z"
+        flow_service.reload_flows()
+        assert len(flow_service.flows) == 1
@@ -37,7 +37,7 @@ def test_optimized_auth_flow():
         
         from line_qa_system.optimized_auth_flow import OptimizedAuthFlow
         
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
         
         # テスト用のユーザーID
         test_user_id = "test_optimized_user"
@@ -54,7 +54,7 @@ def test_optimized_auth_flow():
         
         result1 = auth_flow.process_auth_flow(event1)
         print(f"   結果: {result1}")
-        print(f"   認証状態: {auth_flow.auth_states.get(test_user_id)}")
+        print(f"   認証状態: {auth_flow._get_state(test_user_id)}")
         print(f"   キャッシュ有効: {auth_flow._is_cache_valid()}")
         
         if not result1:
@@ -71,8 +71,8 @@ def test_optimized_auth_flow():
         
         result2 = auth_flow.process_auth_flow(event2)
         print(f"   結果: {result2}")
-        print(f"   認証状態: {auth_flow.auth_states.get(test_user_id)}")
-        print(f"   一時データ: {auth_flow.temp_data.get(test_user_id)}")
+        print(f"   認証状態: {auth_flow._get_state(test_user_id)}")
+        print(f"   一時データ: {auth_flow.sessions.get(test_user_id)}")
         
         if not result2:
             print("   ❌ 店舗コード入力に失敗しました")
@@ -88,7 +88,7 @@ def test_optimized_auth_flow():
         
         result3 = auth_flow.process_auth_flow(event3)
         print(f"   結果: {result3}")
-        print(f"   認証状態: {auth_flow.auth_states.get(test_user_id)}")
+        print(f"   認証状態: {auth_flow._get_state(test_user_id)}")
         print(f"   認証済み: {auth_flow.is_authenticated(test_user_id)}")
         
         if not result3:
@@ -123,7 +123,7 @@ def test_cache_performance():
         
         from line_qa_system.optimized_auth_flow import OptimizedAuthFlow
         
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
         
         # キャッシュ状態の確認
         print(f"   初期キャッシュ状態: {auth_flow._is_cache_valid()}")
@@ -157,7 +157,7 @@ def test_status_change_effect():
         from line_qa_system.optimized_auth_flow import OptimizedAuthFlow
         from line_qa_system.staff_service import StaffService
         
-        auth_flow = OptimizedAuthFlow()
+        auth_flow = OptimizedAuthFlow.get_instance()
         staff_service = StaffService()
         
         # テスト用のユーザーID
@@ -0,0 +1,243 @@
+"""
+最適化認証フローのテスト
+"""
+
+import threading
+
+import pytest
+import line_qa_system.optimized_auth_flow as auth_flow_module
+from line_qa_system.auth_db_service import AuthDBError
+from line_qa_system.optimized_auth_flow import OptimizedAuthFlow
+
+
+USER_ID = "U1"
+STORE_CODE = "STORE001"
+STAFF_ID = "001"
+
+
+class _FakeLineClient:
+    """返信内容を記録するLINEクライアント"""
+
+    def __init__(self):
+        self.replies = []
+
+    def reply_text(self, reply_token, text, quick_reply=None):
+        self.replies.append((reply_token, text))
+        return True
+
+
+class _FakeStoreService:
+    """辞書で店舗を保持する店舗サービス"""
+
+    def __init__(self):
+        self.stores = {
+            STORE_CODE: {"store_code": STORE_CODE, "store_name": "本店", "status": "active"},
+        }
+
+    def load_stores_from_sheet(self):
+        pass
+
+    def get_store(self, store_code):
+        return self.stores.get(store_code)
+
+
+class _FakeStaffService:
+    """辞書でスタッフを保持するスタッフサービス"""
+
+    def __init__(self):
+        self.staff_data = {
+            f"{STORE_CODE}_{STAFF_ID}": {
+                "store_code": STORE_CODE,
+                "staff_id": STAFF_ID,
+                "staff_name": "山田",
+                "status": "active",
+                "line_user_id": USER_ID,
+            },
+        }
+
+    def load_staff_data(self):
+        pass
+
+    def get_staff(self, store_code, staff_id):
+        return self.staff_data.get(f"{store_code}_{staff_id}")
+
+    def get_all_staff(self):
+        return self.staff_data
+
+    def update_auth_info(self, store_code, staff_id, user_id, auth_time):
+        pass
+
+
+class _FakeRedis:
+    """get/setex/getdelのみを持つRedisクライアント"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def getdel(self, key):
+        return self.data.pop(key, None)
+
+
+class _DisabledAuthDB:
+    """無効化された認証データベース"""
+
+    is_enabled = False
+
+
+class _FailingAuthDB:
+    """問い合わせに失敗する認証データベース（failing=Falseにすると登録済みの認証情報を返す）"""
+
+    is_enabled = True
+
+    def __init__(self):
+        self.failing = True
+
+    def get_auth(self, line_user_id, raise_errors=False):
+        if self.failing:
+            raise AuthDBError("connection pool exhausted")
+        return {"store_code": STORE_CODE, "staff_id": STAFF_ID, "store_name": "本店", "staff_name": "山田"}
+
+
+def _event(text, user_id=USER_ID, reply_token="token"):
+    return {
+        "source": {"userId": user_id},
+        "message": {"type": "text", "text": text},
+        "replyToken": reply_token,
+    }
+
+
+@pytest.fixture
+def auth_flow(monkeypatch):
+    monkeypatch.setattr(auth_flow_module, "_AUTH_ENABLED", True)
+    monkeypatch.setattr(auth_flow_module, "LineClient", _FakeLineClient)
+    monkeypatch.setattr(auth_flow_module, "StoreService", _FakeStoreService)
+    monkeypatch.setattr(auth_flow_module, "StaffService", _FakeStaffService)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    flow = OptimizedAuthFlow()
+    flow._auth_db = _DisabledAuthDB()
+    return flow
+
+
+@pytest.fixture
+def redis_auth_flow(auth_flow):
+    auth_flow.redis_client = _FakeRedis()
+    auth_flow.use_redis = True
+    return auth_flow
+
+
+def _authenticate(flow):
+    """認証キーワード・店舗コード・社員番号を順に送信"""
+    assert flow.process_auth_flow(_event("認証")) is True
+    assert flow.process_auth_flow(_event(STORE_CODE)) is True
+    assert flow.process_auth_flow(_event(STAFF_ID)) is True
+
+
+class TestStateTransitions:
+    """認証状態の遷移のテスト"""
+
+    def test_full_flow(self, auth_flow):
+        """認証キーワードから認証完了まで遷移する"""
+        assert auth_flow.process_auth_flow(_event("認証")) is True
+        assert auth_flow._get_state(USER_ID) == "store_code_input_pending"
+
+        assert auth_flow.process_auth_flow(_event(STORE_CODE.lower())) is True
+        assert auth_flow._get_state(USER_ID) == "staff_id_input_pending"
+
+        assert auth_flow.process_auth_flow(_event(STAFF_ID)) is True
+        assert auth_flow._get_state(USER_ID) == "authenticated"
+        assert "認証が完了しました" in auth_flow.line_client.replies[-1][1]
+        assert auth_flow.get_auth_info(USER_ID)["store_code"] == STORE_CODE
+
+        # 認証済みユーザーの通常メッセージはQ&A処理へ進む
+        assert auth_flow.process_auth_flow(_event("料金を教えて")) is False
+
+    def test_unknown_store_code_keeps_state(self, auth_flow):
+        """存在しない店舗コードでは状態が変わらない"""
+        auth_flow.process_auth_flow(_event("認証"))
+        auth_flow.process_auth_flow(_event("STORE999"))
+        assert auth_flow._get_state(USER_ID) == "store_code_input_pending"
+        assert "見つかりません" in auth_flow.line_client.replies[-1][1]
+
+    def test_transition_requires_expected_state(self, auth_flow):
+        """状態が変わっていた場合は遷移しない"""
+        auth_flow.start_auth(USER_ID, "token")
+        assert auth_flow._transition(USER_ID, "staff_id_input_pending", state="authenticated") is None
+        assert auth_flow._get_state(USER_ID) == "store_code_input_pending"
+
+
+class TestCacheInvalidation:
+    """認証結果のキャッシュの無効化のテスト"""
+
+    def test_complete_auth_clears_negative_decision(self, auth_flow):
+        """認証完了時に「認証情報なし」の判定結果を破棄する"""
+        assert auth_flow.is_authenticated(USER_ID) is False
+        assert USER_ID in auth_flow._unauth_decisions
+
+        _authenticate(auth_flow)
+        assert USER_ID not in auth_flow._unauth_decisions
+        assert auth_flow.is_authenticated(USER_ID) is True
+
+    def test_db_error_is_not_cached_as_unauthenticated(self, auth_flow):
+        """データベースの障害時は「認証情報なし」として結果を再利用しない"""
+        auth_db = auth_flow._auth_db = _FailingAuthDB()
+        assert auth_flow.is_authenticated(USER_ID) is False
+        assert USER_ID not in auth_flow._unauth_decisions
+
+        auth_db.failing = False
+        assert auth_flow.is_authenticated(USER_ID) is True
+
+    def test_deauthenticate_clears_cached_auth(self, redis_auth_flow):
+        """認証取り消し時にRedis・プロセス内の認証情報を破棄する"""
+        _authenticate(redis_auth_flow)
+        assert redis_auth_flow.is_authenticated(USER_ID) is True
+        assert redis_auth_flow._local_auth_info.get(USER_ID) is not None
+
+        assert redis_auth_flow.deauthenticate_user(USER_ID) is True
+        assert f"auth:{USER_ID}" not in redis_auth_flow.redis_client.data
+        assert redis_auth_flow._local_auth_info.get(USER_ID) is None
+        assert redis_auth_flow._auth_decisions.get(USER_ID) is None
+        assert redis_auth_flow.is_authenticated(USER_ID) is False
+
+    def test_staff_reload_rechecks_status(self, auth_flow):
+        """スタッフ情報を再読み込みすると、キャッシュした判定結果を使わずにステータスを確認する"""
+        _authenticate(auth_flow)
+        assert auth_flow.is_authenticated(USER_ID) is True
+
+        staff = auth_flow.staff_service.get_staff(STORE_CODE, STAFF_ID)
+        staff["status"] = "suspended"
+        # 同じ世代のスタッフ情報で確認済みの間は判定結果を再利用
+        assert auth_flow.is_authenticated(USER_ID) is True
+
+        generation = auth_flow._staff_cache_gen
+        auth_flow.force_cache_update()
+        assert auth_flow._staff_cache_gen == generation + 1
+        assert auth_flow.is_authenticated(USER_ID) is False
+        assert auth_flow._get_state(USER_ID) == "not_started"
+
+
+class TestAuthRequiredReply:
+    """認証要求メッセージの送信間隔のテスト"""
+
+    def test_reply_is_rate_limited(self, auth_flow):
+        """未認証のまま連投しても認証要求メッセージは1回のみ送信する"""
+        assert auth_flow.process_auth_flow(_event("こんにちは", user_id="U2")) is True
+        assert auth_flow.process_auth_flow(_event("こんにちは", user_id="U2")) is True
+        assert auth_flow.line_client.replies == [("token", auth_flow_module._MSG_AUTH_REQUIRED)]
+
+    def test_concurrent_messages_send_one_reply(self, auth_flow):
+        """同時に届いたメッセージでも認証要求メッセージは1回のみ送信する"""
+        threads = [
+            threading.Thread(target=auth_flow.process_auth_flow, args=(_event("こんにちは", user_id="U3"),))
+            for _ in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(auth_flow.line_client.replies) == 1
@@ -0,0 +1,111 @@
+"""
+Q&A検索サービスのテスト
+"""
+
+import gspread
+import pytest
+import line_qa_system.qa_service as qa_service_module
+from line_qa_system.qa_service import QAService
+
+
+QA_RECORDS = [
+    {"id": 1, "question": "料金プランを教えてください", "keywords": "料金,プラン", "tags": "#料金",
+     "answer": "ベーシックとプレミアムがあります", "priority": 1, "status": "active", "updated_at": ""},
+    {"id": 2, "question": "納期はどのくらいですか", "keywords": "納期", "tags": "#納期",
+     "answer": "通常2週間です", "priority": 1, "status": "active", "updated_at": ""},
+    {"id": 3, "question": "テロップの修正はできますか", "keywords": "テロップ,修正", "tags": "#修正",
+     "answer": "2回まで無料です", "priority": 2, "status": "active", "updated_at": ""},
+    {"id": 4, "question": "古い質問", "keywords": "", "tags": "",
+     "answer": "", "priority": 1, "status": "inactive", "updated_at": ""},
+]
+
+
+QA_HEADER = ["id", "question", "keywords", "tags", "answer", "priority", "status", "updated_at"]
+
+
+class _FakeWorksheet:
+    """get_all_valuesのみを持つワークシート"""
+
+    def __init__(self, records):
+        self.records = records
+        self.acell_calls = 0
+
+    def acell(self, label):
+        self.acell_calls += 1
+        return QA_HEADER[0]
+
+    def get_all_values(self):
+        rows = [[str(record[column]) for column in QA_HEADER] for record in self.records]
+        return [QA_HEADER] + rows
+
+
+class _FakeSpreadsheet:
+    """worksheetのみを持つスプレッドシート"""
+
+    def __init__(self, records):
+        self.sheet = _FakeWorksheet(records)
+
+    def worksheet(self, name):
+        return self.sheet
+
+
+class _FakeClient:
+    """open_by_keyのみを持つgspreadクライアント"""
+
+    def __init__(self, records):
+        self.spreadsheet = _FakeSpreadsheet(records)
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+
+@pytest.fixture
+def qa_service(monkeypatch):
+    monkeypatch.setattr(qa_service_module, "get_gspread_client", lambda: _FakeClient(QA_RECORDS))
+    return QAService()
+
+
+class TestSearchQAItems:
+    """キーワードマッチング検索のテスト"""
+
+    def test_inactive_items_are_skipped(self, qa_service):
+        """アクティブでないアイテムは読み込まない"""
+        assert [item.id for item in qa_service.qa_items] == [1, 2, 3]
+
+    def test_exact_question_is_top_result(self, qa_service):
+        """質問文と一致する場合は最高スコアになる"""
+        results = qa_service._search_qa_items("納期はどのくらいですか？")
+        # 完全一致したアイテムのみを返す
+        assert [result.id for result in results] == [2]
+        assert results[0].score == 1.0
+        assert results[0].match_type == "exact_match"
+
+    def test_fuzzy_scores_without_numpy(self, qa_service, monkeypatch):
+        """numpyが無い環境でも同じスコアになる"""
+        query = "てろっぷを直したい"
+        expected = {result.id: result.score for result in qa_service._search_qa_items(query)}
+
+        monkeypatch.setattr(qa_service_module, "NUMPY_AVAILABLE", False)
+        actual = {result.id: result.score for result in qa_service._search_qa_items(query)}
+        assert actual == pytest.approx(expected)
+
+
+class TestValuesToRecords:
+    """シートの値から辞書への変換のテスト"""
+
+    def test_duplicate_headers_raise(self):
+        """ヘッダーが重複している場合は列を上書きせずに例外を送出する"""
+        values = [["id", "question", "question"], ["1", "料金", "納期"]]
+        with pytest.raises(gspread.exceptions.GSpreadException):
+            QAService._values_to_records(values)
+
+
+class TestHealthCheck:
+    """ヘルスチェックのテスト"""
+
+    def test_reads_single_cell(self, qa_service):
+        """ヘルスチェックのたびに1セルのみ読み取る"""
+        sheet = qa_service.gc.spreadsheet.sheet
+        assert qa_service.health_check() is True
+        assert qa_service.health_check() is True
+        assert sheet.acell_calls == 2